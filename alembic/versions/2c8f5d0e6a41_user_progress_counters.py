@@ -0,0 +1,43 @@
+"""user progress counters
+
+Revision ID: 2c8f5d0e6a41
+Revises: 7a1e4c9b2f30
+Create Date: 2026-10-15 10:03:12.552019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c8f5d0e6a41'
+down_revision: Union[str, None] = '7a1e4c9b2f30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('total_challenges_passed', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('total_badges', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill the counters from existing history
+    op.execute(
+        """
+        UPDATE users SET
+            total_challenges_passed = (
+                SELECT count(*) FROM attempts
+                WHERE attempts.user_id = users.id AND attempts.status = 'PASSED'
+            ),
+            total_badges = (
+                SELECT count(*) FROM user_badges
+                WHERE user_badges.user_id = users.id
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'total_badges')
+    op.drop_column('users', 'total_challenges_passed')
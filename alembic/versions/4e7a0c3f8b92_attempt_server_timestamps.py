@@ -0,0 +1,38 @@
+"""attempt server timestamps
+
+Revision ID: 4e7a0c3f8b92
+Revises: 9d3b6e2a1c57
+Create Date: 2026-10-15 11:20:07.664810
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e7a0c3f8b92'
+down_revision: Union[str, None] = '9d3b6e2a1c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        'attempts',
+        'started_at',
+        existing_type=sa.DateTime(),
+        existing_nullable=False,
+        server_default=sa.text("timezone('utc', now())"),
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'attempts',
+        'started_at',
+        existing_type=sa.DateTime(),
+        existing_nullable=False,
+        server_default=None,
+    )
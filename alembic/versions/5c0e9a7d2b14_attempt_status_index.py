@@ -0,0 +1,31 @@
+"""attempt status index
+
+Revision ID: 5c0e9a7d2b14
+Revises: b81f2d6c4e09
+Create Date: 2026-10-15 14:05:52.731640
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c0e9a7d2b14'
+down_revision: Union[str, None] = 'b81f2d6c4e09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_attempts_user_id_status',
+        'attempts',
+        ['user_id', 'status'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attempts_user_id_status', table_name='attempts')
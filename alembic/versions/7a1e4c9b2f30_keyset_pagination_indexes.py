@@ -0,0 +1,38 @@
+"""keyset pagination indexes
+
+Revision ID: 7a1e4c9b2f30
+Revises: d3b37d5178da
+Create Date: 2026-10-15 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a1e4c9b2f30'
+down_revision: Union[str, None] = 'd3b37d5178da'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_attempts_user_id_started_at_id',
+        'attempts',
+        ['user_id', sa.text('started_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+    op.create_index(
+        'ix_challenges_published_created_at_id',
+        'challenges',
+        ['published', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_challenges_published_created_at_id', table_name='challenges')
+    op.drop_index('ix_attempts_user_id_started_at_id', table_name='attempts')
@@ -0,0 +1,28 @@
+"""challenge updated_at
+
+Revision ID: 9d3b6e2a1c57
+Revises: 2c8f5d0e6a41
+Create Date: 2026-10-15 10:41:55.093318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3b6e2a1c57'
+down_revision: Union[str, None] = '2c8f5d0e6a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('challenges', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE challenges SET updated_at = created_at")
+    op.alter_column('challenges', 'updated_at', nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('challenges', 'updated_at')
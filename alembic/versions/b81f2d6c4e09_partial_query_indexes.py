@@ -0,0 +1,58 @@
+"""partial query indexes
+
+Revision ID: b81f2d6c4e09
+Revises: 4e7a0c3f8b92
+Create Date: 2026-10-15 11:48:31.402957
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81f2d6c4e09'
+down_revision: Union[str, None] = '4e7a0c3f8b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Every challenge listing filters on published, so index only those rows
+    op.drop_index('ix_challenges_published_created_at_id', table_name='challenges')
+    op.create_index(
+        'ix_challenges_published_created_at_id',
+        'challenges',
+        [sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_where=sa.text('published'),
+    )
+    op.create_index(
+        'ix_attempts_user_id_passed',
+        'attempts',
+        ['user_id', 'submitted_at'],
+        unique=False,
+        postgresql_where=sa.text("status = 'PASSED'"),
+    )
+    op.create_index(
+        'ix_user_badges_user_id_awarded_at',
+        'user_badges',
+        ['user_id', sa.text('awarded_at DESC')],
+        unique=False,
+    )
+    # Covered by the leading column of ix_attempts_user_id_started_at_id
+    op.drop_index('ix_attempts_user_id', table_name='attempts')
+
+
+def downgrade() -> None:
+    op.create_index('ix_attempts_user_id', 'attempts', ['user_id'], unique=False)
+    op.drop_index('ix_user_badges_user_id_awarded_at', table_name='user_badges')
+    op.drop_index('ix_attempts_user_id_passed', table_name='attempts')
+    op.drop_index('ix_challenges_published_created_at_id', table_name='challenges')
+    op.create_index(
+        'ix_challenges_published_created_at_id',
+        'challenges',
+        ['published', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
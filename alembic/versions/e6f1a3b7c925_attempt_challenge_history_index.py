@@ -0,0 +1,31 @@
+"""attempt challenge history index
+
+Revision ID: e6f1a3b7c925
+Revises: 5c0e9a7d2b14
+Create Date: 2026-10-15 16:42:18.204517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6f1a3b7c925'
+down_revision: Union[str, None] = '5c0e9a7d2b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_attempts_user_id_challenge_id_started_at',
+        'attempts',
+        ['user_id', 'challenge_id', sa.text('started_at DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attempts_user_id_challenge_id_started_at', table_name='attempts')
@@ -1,18 +1,22 @@
-from datetime import datetime
-from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from sqlalchemy import insert, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_current_active_user
-from app.db.models import Attempt, AttemptStatusEnum, Challenge, User
+from app.core.pagination import decode_cursor, encode_cursor
+from app.db.models import Attempt, AttemptStatusEnum, Challenge, User, utcnow_sql
 from app.db.session import get_db
-from app.schemas.attempt import AttemptCreate, AttemptResponse, AttemptSubmit
+from app.schemas.attempt import AttemptCreate, AttemptPage, AttemptResponse, AttemptSubmit
+from app.tasks.celery_app import celery_app
 
 router = APIRouter()
 
+# Columns read by AttemptResponse; list queries select these directly
+# instead of materializing ORM entities that are serialized and discarded.
+_ATTEMPT_COLUMNS = [getattr(Attempt, name) for name in AttemptResponse.model_fields]
+
 
 @router.post("/", response_model=AttemptResponse, status_code=status.HTTP_201_CREATED)
 async def create_attempt(
@@ -26,10 +30,7 @@ async def create_attempt(
     - **challenge_id**: UUID of the challenge to attempt
     """
     # Verify challenge exists
-    result = await db.execute(
-        select(Challenge).where(Challenge.id == attempt_data.challenge_id)
-    )
-    challenge = result.scalar_one_or_none()
+    challenge = await db.get(Challenge, attempt_data.challenge_id)
 
     if not challenge:
         raise HTTPException(
@@ -43,17 +44,18 @@ async def create_attempt(
             detail="Challenge is not published"
         )
 
-    # Create new attempt
-    new_attempt = Attempt(
-        user_id=current_user.id,
-        challenge_id=attempt_data.challenge_id,
-        status=AttemptStatusEnum.STARTED,
-        started_at=datetime.utcnow()
+    # Create new attempt; RETURNING hands back the server-stamped started_at
+    result = await db.execute(
+        insert(Attempt)
+        .values(
+            user_id=current_user.id,
+            challenge_id=attempt_data.challenge_id,
+            status=AttemptStatusEnum.STARTED
+        )
+        .returning(Attempt)
     )
-
-    db.add(new_attempt)
+    new_attempt = result.scalar_one()
     await db.commit()
-    await db.refresh(new_attempt)
 
     return new_attempt
 
@@ -62,6 +64,7 @@ async def create_attempt(
 async def submit_attempt(
     attempt_id: UUID,
     submit_data: AttemptSubmit,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -71,83 +74,109 @@ async def submit_attempt(
     This endpoint will:
     1. Update the attempt with the score and status
     2. Enqueue a background job to award XP and check for badges
+       once the response has been sent
 
     - **score**: Score achieved (0-100)
     - **solution**: Optional solution submitted
     - **metadata**: Optional metadata
     """
-    # Get the attempt
+    # Store solution in metadata
+    attempt_metadata = dict(submit_data.metadata or {})
+    if submit_data.solution:
+        attempt_metadata["solution"] = submit_data.solution
+
+    # Update the attempt only if it belongs to the user and is still open
     result = await db.execute(
-        select(Attempt).where(Attempt.id == attempt_id)
+        update(Attempt)
+        .where(
+            Attempt.id == attempt_id,
+            Attempt.user_id == current_user.id,
+            Attempt.status == AttemptStatusEnum.STARTED
+        )
+        .values(
+            score=submit_data.score,
+            submitted_at=utcnow_sql(),
+            status=AttemptStatusEnum.SUBMITTED,
+            attempt_metadata=attempt_metadata
+        )
+        .returning(Attempt)
     )
     attempt = result.scalar_one_or_none()
 
     if not attempt:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Attempt not found"
+        # Nothing was updated; look up why
+        result = await db.execute(
+            select(Attempt.user_id).where(Attempt.id == attempt_id)
         )
+        owner_id = result.scalar_one_or_none()
 
-    # Verify user owns this attempt
-    if attempt.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to submit this attempt"
-        )
+        if owner_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Attempt not found"
+            )
+
+        # Verify user owns this attempt
+        if owner_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to submit this attempt"
+            )
 
-    # Check if already submitted
-    if attempt.status in [AttemptStatusEnum.SUBMITTED, AttemptStatusEnum.PASSED, AttemptStatusEnum.FAILED]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Attempt already submitted"
         )
 
-    # Update attempt
-    attempt.score = submit_data.score
-    attempt.submitted_at = datetime.utcnow()
-    attempt.status = AttemptStatusEnum.SUBMITTED
-
-    # Store solution in metadata
-    if submit_data.metadata:
-        attempt.attempt_metadata = submit_data.metadata
-    else:
-        attempt.attempt_metadata = {}
-
-    if submit_data.solution:
-        attempt.attempt_metadata["solution"] = submit_data.solution
-
     await db.commit()
-    await db.refresh(attempt)
 
-    # Enqueue background task to process XP and badges
-    # Import here to avoid circular dependency
-    from app.tasks.worker import award_xp_and_badges
-    award_xp_and_badges.delay(str(attempt.id))
+    # Enqueue background task to process XP and badges (by name, so the
+    # worker module and its sync engine are never imported by the API).
+    # The broker round trip happens after the response is sent.
+    background_tasks.add_task(
+        celery_app.send_task, "award_xp_and_badges", args=[str(attempt.id)]
+    )
 
     return attempt
 
 
-@router.get("/", response_model=List[AttemptResponse])
+@router.get("/", response_model=AttemptPage)
 async def list_attempts(
-    skip: int = Query(0, ge=0),
+    cursor: str | None = Query(None),
     limit: int = Query(10, ge=1, le=100),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    List current user's attempts.
+    List current user's attempts, newest first.
 
-    - **skip**: Number of records to skip (pagination)
+    - **cursor**: Opaque cursor from a previous page's `next_cursor` (pagination)
     - **limit**: Maximum number of records to return (1-100)
     """
-    query = select(Attempt).where(
-        Attempt.user_id == current_user.id
-    ).offset(skip).limit(limit).order_by(Attempt.started_at.desc())
+    query = select(*_ATTEMPT_COLUMNS).where(Attempt.user_id == current_user.id)
 
-    result = await db.execute(query)
-    attempts = result.scalars().all()
+    if cursor:
+        cursor_ts, cursor_id = decode_cursor(cursor)
+        query = query.where(tuple_(Attempt.started_at, Attempt.id) < tuple_(cursor_ts, cursor_id))
 
-    return attempts
+    # Fetch one extra row to know whether another page follows
+    query = query.order_by(Attempt.started_at.desc(), Attempt.id.desc()).limit(limit + 1)
+
+    result = await db.execute(query)
+    attempts = result.mappings().all()
+
+    next_cursor = None
+    if len(attempts) > limit:
+        attempts = attempts[:limit]
+        next_cursor = encode_cursor(attempts[-1]["started_at"], attempts[-1]["id"])
+
+    # Rows come straight from the database, so build the page without
+    # re-validating every field and serialize it once
+    page = AttemptPage.model_construct(
+        items=[AttemptResponse.model_construct(**row) for row in attempts],
+        next_cursor=next_cursor
+    )
+    return Response(content=page.model_dump_json(), media_type="application/json")
 
 
 @router.get("/{attempt_id}", response_model=AttemptResponse)
@@ -159,10 +188,7 @@ async def get_attempt(
     """
     Get a specific attempt by ID.
     """
-    result = await db.execute(
-        select(Attempt).where(Attempt.id == attempt_id)
-    )
-    attempt = result.scalar_one_or_none()
+    attempt = await db.get(Attempt, attempt_id)
 
     if not attempt:
         raise HTTPException(
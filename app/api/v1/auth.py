@@ -7,15 +7,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_current_active_user
 from app.core.security import (
+    aget_password_hash,
+    averify_password,
     create_access_token,
     create_refresh_token,
     decode_token,
-    get_password_hash,
-    verify_password,
 )
 from app.db.models import User
 from app.db.session import get_db
 from app.schemas.user import Token, UserCreate, UserProfile, UserResponse
+from app.services.redis_service import is_token_revoked
 
 router = APIRouter()
 
@@ -52,14 +53,15 @@ async def register(
     new_user = User(
         username=user_data.username,
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await aget_password_hash(user_data.password),
         total_xp=0,
         level=1
     )
 
     db.add(new_user)
+    # id and created_at are client-side defaults and sessions don't expire on
+    # commit, so the new row is returned without a refresh round-trip
     await db.commit()
-    await db.refresh(new_user)
 
     return new_user
 
@@ -79,7 +81,7 @@ async def login(
     user = result.scalar_one_or_none()
 
     # Verify user exists and password is correct
-    if not user or not verify_password(form_data.password, user.password_hash):
+    if not user or not await averify_password(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -107,7 +109,11 @@ async def refresh_token(
     """
     # Decode refresh token
     payload = decode_token(refresh_token)
-    if payload is None or payload.get("type") != "refresh":
+    if (
+        payload is None
+        or payload.get("type") != "refresh"
+        or ("jti" in payload and await is_token_revoked(payload["jti"]))
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token",
@@ -133,8 +139,7 @@ async def refresh_token(
         )
 
     # Verify user still exists
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await db.get(User, user_id)
 
     if user is None:
         raise HTTPException(
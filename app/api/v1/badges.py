@@ -1,29 +1,54 @@
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, raiseload
 
+from app.core.cache import cached, invalidate, make_etag, not_modified
 from app.core.deps import get_current_active_user
 from app.db.models import Badge, User, UserBadge
 from app.db.session import get_db
 from app.schemas.badge import BadgeCreate, BadgeResponse, UserBadgeResponse
+from app.services.redis_service import invalidate_badges_cache
 
 router = APIRouter()
 
+_badge_list_adapter = TypeAdapter(List[BadgeResponse])
+
+# Columns read by BadgeResponse; the list query selects these directly
+# instead of materializing ORM entities that are serialized and discarded.
+_BADGE_COLUMNS = [getattr(Badge, name) for name in BadgeResponse.model_fields]
+
+
+@cached("badges:list", ttl=600, response_model=List[BadgeResponse])
+async def _load_badges(db: AsyncSession):
+    """Load all badges, served from Redis when cached."""
+    result = await db.execute(select(*_BADGE_COLUMNS).order_by(Badge.created_at))
+    return result.mappings().all()
+
 
 @router.get("/", response_model=List[BadgeResponse])
 async def list_badges(
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
     """
     List all available badges and their conditions.
+
+    Responses carry an ETag; send it back in If-None-Match to get 304 Not Modified.
     """
-    result = await db.execute(select(Badge).order_by(Badge.created_at))
-    badges = result.scalars().all()
-    return badges
+    badges = await _load_badges(db)
+    body = _badge_list_adapter.dump_json(badges)
+
+    etag = make_etag(body)
+    headers = {"ETag": etag, "Cache-Control": "max-age=60"}
+    if not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.post("/", response_model=BadgeResponse, status_code=status.HTTP_201_CREATED)
@@ -53,16 +78,22 @@ async def create_badge(
             detail="Badge with this name already exists"
         )
 
-    new_badge = Badge(
-        name=badge_data.name,
-        description=badge_data.description,
-        condition=badge_data.condition,
-        icon_url=badge_data.icon_url
+    # Insert and read back the stored row in one statement
+    result = await db.execute(
+        insert(Badge)
+        .values(
+            name=badge_data.name,
+            description=badge_data.description,
+            condition=badge_data.condition,
+            icon_url=badge_data.icon_url
+        )
+        .returning(Badge)
     )
-
-    db.add(new_badge)
+    new_badge = result.scalar_one()
     await db.commit()
-    await db.refresh(new_badge)
+
+    await invalidate("badges:list")
+    await invalidate_badges_cache()
 
     return new_badge
 
@@ -76,8 +107,7 @@ async def get_user_badges(
     Get all badges earned by a specific user.
     """
     # Verify user exists
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await db.get(User, user_id)
 
     if not user:
         raise HTTPException(
@@ -88,11 +118,11 @@ async def get_user_badges(
     # Get user's badges with badge details
     result = await db.execute(
         select(UserBadge)
-        .options(joinedload(UserBadge.badge))
+        .options(joinedload(UserBadge.badge), raiseload("*"))
         .where(UserBadge.user_id == user_id)
         .order_by(UserBadge.awarded_at.desc())
     )
-    user_badges = result.scalars().all()
+    user_badges = result.unique().scalars().all()
 
     # Transform to response format
     response = []
@@ -121,11 +151,11 @@ async def get_my_badges(
     # Get user's badges with badge details
     result = await db.execute(
         select(UserBadge)
-        .options(joinedload(UserBadge.badge))
+        .options(joinedload(UserBadge.badge), raiseload("*"))
         .where(UserBadge.user_id == current_user.id)
         .order_by(UserBadge.awarded_at.desc())
     )
-    user_badges = result.scalars().all()
+    user_badges = result.unique().scalars().all()
 
     # Transform to response format
     response = []
@@ -1,67 +1,105 @@
-from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import func, insert, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import cached, invalidate, make_etag, not_modified
 from app.core.deps import get_current_active_user
-from app.db.models import Challenge, DifficultyEnum, User
+from app.core.pagination import decode_cursor, encode_cursor
+from app.db.models import Attempt, AttemptStatusEnum, Challenge, DifficultyEnum, User
 from app.db.session import get_db
 from app.schemas.challenge import (
     ChallengeCreate,
+    ChallengePage,
     ChallengeResponse,
     ChallengeUpdate,
 )
+from app.services.redis_service import invalidate_cached_users
 
 router = APIRouter()
 
+# Columns read by ChallengeResponse; list queries select these directly
+# instead of materializing ORM entities that are serialized and discarded.
+_CHALLENGE_COLUMNS = [getattr(Challenge, name) for name in ChallengeResponse.model_fields]
 
-@router.get("/", response_model=List[ChallengeResponse])
+
+@router.get("/", response_model=ChallengePage)
+@cached("chal:list", ttl=60, response_model=ChallengePage)
 async def list_challenges(
     difficulty: DifficultyEnum | None = None,
-    skip: int = Query(0, ge=0),
+    cursor: str | None = Query(None),
     limit: int = Query(10, ge=1, le=100),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    List all published challenges with optional filters.
+    List all published challenges with optional filters, newest first.
 
     - **difficulty**: Filter by difficulty level (easy, medium, hard)
-    - **skip**: Number of records to skip (pagination)
+    - **cursor**: Opaque cursor from a previous page's `next_cursor` (pagination)
     - **limit**: Maximum number of records to return (1-100)
     """
-    query = select(Challenge).where(Challenge.published)
+    query = select(*_CHALLENGE_COLUMNS).where(Challenge.published)
 
     if difficulty:
         query = query.where(Challenge.difficulty == difficulty)
 
-    query = query.offset(skip).limit(limit).order_by(Challenge.created_at.desc())
+    if cursor:
+        cursor_ts, cursor_id = decode_cursor(cursor)
+        query = query.where(tuple_(Challenge.created_at, Challenge.id) < tuple_(cursor_ts, cursor_id))
+
+    # Fetch one extra row to know whether another page follows
+    query = query.order_by(Challenge.created_at.desc(), Challenge.id.desc()).limit(limit + 1)
 
     result = await db.execute(query)
-    challenges = result.scalars().all()
+    challenges = result.mappings().all()
+
+    next_cursor = None
+    if len(challenges) > limit:
+        challenges = challenges[:limit]
+        next_cursor = encode_cursor(challenges[-1]["created_at"], challenges[-1]["id"])
+
+    return {"items": challenges, "next_cursor": next_cursor}
 
-    return challenges
+
+@cached("chal:one:{challenge_id}", ttl=300, response_model=ChallengeResponse)
+async def _load_challenge(challenge_id: UUID, db: AsyncSession):
+    """Load a challenge by ID, served from Redis when cached."""
+    challenge = await db.get(Challenge, challenge_id)
+
+    if not challenge:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Challenge not found"
+        )
+
+    return challenge
 
 
 @router.get("/{challenge_id}", response_model=ChallengeResponse)
 async def get_challenge(
     challenge_id: UUID,
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get a specific challenge by ID.
+
+    Responses carry an ETag derived from the challenge's last update; send it
+    back in If-None-Match to get 304 Not Modified.
     """
-    result = await db.execute(select(Challenge).where(Challenge.id == challenge_id))
-    challenge = result.scalar_one_or_none()
+    challenge = await _load_challenge(challenge_id, db)
 
-    if not challenge:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Challenge not found"
-        )
+    etag = make_etag(f"{challenge.id}:{challenge.updated_at.isoformat()}".encode())
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-    return challenge
+    return Response(
+        content=challenge.model_dump_json(),
+        media_type="application/json",
+        headers=headers
+    )
 
 
 @router.post("/", response_model=ChallengeResponse, status_code=status.HTTP_201_CREATED)
@@ -80,19 +118,24 @@ async def create_challenge(
     - **tags**: Optional list of tags
     - **published**: Whether the challenge is published (default: true)
     """
-    new_challenge = Challenge(
-        title=challenge_data.title,
-        description=challenge_data.description,
-        xp=challenge_data.xp,
-        difficulty=challenge_data.difficulty,
-        tags=challenge_data.tags,
-        published=challenge_data.published,
-        created_by=current_user.id
+    # Insert and read back the stored row in one statement
+    result = await db.execute(
+        insert(Challenge)
+        .values(
+            title=challenge_data.title,
+            description=challenge_data.description,
+            xp=challenge_data.xp,
+            difficulty=challenge_data.difficulty,
+            tags=challenge_data.tags,
+            published=challenge_data.published,
+            created_by=current_user.id
+        )
+        .returning(Challenge)
     )
-
-    db.add(new_challenge)
+    new_challenge = result.scalar_one()
     await db.commit()
-    await db.refresh(new_challenge)
+
+    await invalidate("chal:list")
 
     return new_challenge
 
@@ -109,8 +152,7 @@ async def update_challenge(
 
     Only fields provided in the request will be updated.
     """
-    result = await db.execute(select(Challenge).where(Challenge.id == challenge_id))
-    challenge = result.scalar_one_or_none()
+    challenge = await db.get(Challenge, challenge_id)
 
     if not challenge:
         raise HTTPException(
@@ -133,6 +175,8 @@ async def update_challenge(
     await db.commit()
     await db.refresh(challenge)
 
+    await invalidate("chal:list", f"chal:one:{challenge_id}")
+
     return challenge
 
 
@@ -145,8 +189,7 @@ async def delete_challenge(
     """
     Delete a challenge (only by creator).
     """
-    result = await db.execute(select(Challenge).where(Challenge.id == challenge_id))
-    challenge = result.scalar_one_or_none()
+    challenge = await db.get(Challenge, challenge_id)
 
     if not challenge:
         raise HTTPException(
@@ -161,7 +204,28 @@ async def delete_challenge(
             detail="Not authorized to delete this challenge"
         )
 
+    # Its attempts are deleted with it, so take their passes back off the
+    # denormalized counters in the same transaction. XP and levels are
+    # lifetime totals and are kept.
+    passes = (
+        select(Attempt.user_id, func.count().label("passed"))
+        .where(Attempt.challenge_id == challenge_id)
+        .where(Attempt.status == AttemptStatusEnum.PASSED)
+        .group_by(Attempt.user_id)
+        .subquery()
+    )
+    result = await db.execute(
+        update(User)
+        .where(User.id == passes.c.user_id)
+        .values(total_challenges_passed=User.total_challenges_passed - passes.c.passed)
+        .returning(User.id)
+    )
+    affected_users = result.scalars().all()
+
     await db.delete(challenge)
     await db.commit()
 
+    await invalidate("chal:list", f"chal:one:{challenge_id}")
+    await invalidate_cached_users(affected_users)
+
     return None
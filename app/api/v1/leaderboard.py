@@ -1,13 +1,24 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
-from app.db.models import Attempt, AttemptStatusEnum, User, UserBadge
+from app.db.models import Attempt, User
 from app.db.session import get_db
-from app.schemas.leaderboard import LeaderboardEntry, LeaderboardResponse, UserProgress
-from app.services.redis_service import get_leaderboard
+from app.schemas.leaderboard import (
+    LEADERBOARD_LIST_ADAPTER,
+    LeaderboardEntry,
+    LeaderboardResponse,
+    UserProgress,
+)
+from app.services.redis_service import (
+    LEADERBOARD_SNAPSHOT_SIZE,
+    cache_leaderboard_snapshot,
+    get_leaderboard,
+    get_leaderboard_snapshot,
+)
 from app.services.xp_service import calculate_next_level_xp
 
 router = APIRouter()
@@ -25,36 +36,60 @@ async def get_leaderboard_endpoint(
 
     - **limit**: Number of top users to return (1-100, default: 10)
     """
-    # Get leaderboard from Redis
-    leaderboard_data = await get_leaderboard(limit)
+    # Serve the precomputed top of the leaderboard while it is current
+    snapshot = await get_leaderboard_snapshot()
+    if snapshot is not None:
+        entries = LEADERBOARD_LIST_ADAPTER.validate_json(snapshot)[:limit]
+        leaderboard = LeaderboardResponse.model_construct(
+            entries=entries,
+            total_count=len(entries)
+        )
+        return Response(content=leaderboard.model_dump_json(), media_type="application/json")
 
-    # Get user details from database
-    user_ids = [UUID(user_id) for user_id, _ in leaderboard_data]
+    # Rebuild the snapshot from the live sorted set
+    leaderboard_data = await get_leaderboard(LEADERBOARD_SNAPSHOT_SIZE)
 
-    result = await db.execute(
-        select(User).where(User.id.in_(user_ids))
-    )
-    users_dict = {user.id: user for user in result.scalars().all()}
-
-    # Build response
-    entries = []
-    for rank, (user_id_str, xp) in enumerate(leaderboard_data, start=1):
-        user_id = UUID(user_id_str)
-        user = users_dict.get(user_id)
-
-        if user:
-            entries.append(LeaderboardEntry(
-                user_id=user.id,
-                username=user.username,
-                total_xp=int(xp),
-                level=user.level,
-                rank=rank
-            ))
-
-    return LeaderboardResponse(
+    # Parse user ids once; ranks follow the Redis ordering
+    ranked = [
+        (rank, UUID(user_id), int(xp))
+        for rank, (user_id, xp, _) in enumerate(leaderboard_data, start=1)
+    ]
+
+    # Usernames and levels are stored alongside the scores; only users
+    # without stored details are looked up in the database
+    users = {
+        UUID(user_id): (details["username"], int(details["level"]))
+        for user_id, _, details in leaderboard_data
+        if details
+    }
+    missing = [user_id for _, user_id, _ in ranked if user_id not in users]
+    if missing:
+        result = await db.execute(
+            select(User.id, User.username, User.level).where(User.id.in_(missing))
+        )
+        users.update({row.id: (row.username, row.level) for row in result})
+
+    # Build response, skipping users that no longer exist; every value is
+    # already typed, so the entries are constructed without validation
+    entries = [
+        LeaderboardEntry.model_construct(
+            user_id=user_id,
+            username=user[0],
+            total_xp=xp,
+            level=user[1],
+            rank=rank
+        )
+        for rank, user_id, xp in ranked
+        if (user := users.get(user_id)) is not None
+    ]
+    await cache_leaderboard_snapshot(LEADERBOARD_LIST_ADAPTER.dump_json(entries))
+
+    entries = entries[:limit]
+    leaderboard = LeaderboardResponse.model_construct(
         entries=entries,
         total_count=len(entries)
     )
+    return Response(content=leaderboard.model_dump_json(), media_type="application/json")
 
 
 @router.get("/users/{user_id}/progress", response_model=UserProgress)
@@ -67,9 +102,8 @@ async def get_user_progress(
 
     - **user_id**: UUID of the user
     """
-    # Get user
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    # Get user; completed-challenge and badge counts are denormalized onto the row
+    user = await db.get(User, user_id)
 
     if not user:
         raise HTTPException(
@@ -77,24 +111,10 @@ async def get_user_progress(
             detail="User not found"
         )
 
-    # Count completed challenges
-    result = await db.execute(
-        select(func.count(Attempt.id))
-        .where(Attempt.user_id == user_id)
-        .where(Attempt.status == AttemptStatusEnum.PASSED)
-    )
-    total_challenges_completed = result.scalar() or 0
-
-    # Count badges
-    result = await db.execute(
-        select(func.count(UserBadge.id))
-        .where(UserBadge.user_id == user_id)
-    )
-    total_badges = result.scalar() or 0
-
     # Get recent attempts
     result = await db.execute(
         select(Attempt)
+        .options(raiseload("*"))
         .where(Attempt.user_id == user_id)
         .order_by(Attempt.started_at.desc())
         .limit(5)
@@ -122,7 +142,7 @@ async def get_user_progress(
         total_xp=user.total_xp,
         level=user.level,
         next_level_xp=next_level_xp,
-        total_challenges_completed=total_challenges_completed,
-        total_badges=total_badges,
+        total_challenges_completed=user.total_challenges_passed,
+        total_badges=user.total_badges,
         recent_attempts=recent_attempts_data
     )
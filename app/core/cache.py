@@ -0,0 +1,114 @@
+import functools
+import hashlib
+import inspect
+import json
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+from fastapi import Request
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
+
+from app.services.redis_service import get_redis
+
+# Only simple request parameters take part in the cache key;
+# injected dependencies such as the database session are ignored.
+_KEY_TYPES = (str, int, float, bool, UUID, Enum)
+
+
+def _index_key(prefix: str) -> str:
+    """Name of the set tracking every cached key under a prefix."""
+    return f"{prefix}:keys"
+
+
+def build_cache_key(prefix: str, params: dict[str, Any]) -> str:
+    """Build a cache key from a prefix and the hashed request parameters."""
+    digest = hashlib.md5(json.dumps(sorted(params.items()), default=str).encode()).hexdigest()
+    return f"{prefix}:{digest}"
+
+
+def cached(prefix: str, ttl: int, response_model: Any):
+    """
+    Cache-aside decorator for read-only endpoints and loaders.
+
+    The decorated function's result is validated into `response_model` and
+    stored in Redis for `ttl` seconds; hits and misses both return the model.
+    `prefix` may reference endpoint parameters, e.g. "chal:one:{challenge_id}",
+    so entries can be invalidated per object. Redis errors fall through to
+    the endpoint.
+    """
+    adapter = TypeAdapter(response_model)
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = {
+                name: value for name, value in bound.arguments.items()
+                if isinstance(value, _KEY_TYPES)
+            }
+            key_prefix = prefix.format_map(params)
+            key = build_cache_key(key_prefix, params)
+
+            try:
+                redis = await get_redis()
+                hit = await redis.get(key)
+            except RedisError:
+                redis, hit = None, None
+
+            if hit is not None:
+                return adapter.validate_json(hit)
+
+            result = adapter.validate_python(await func(*args, **kwargs), from_attributes=True)
+
+            if redis is not None:
+                # Record the key under its prefix so invalidate() can find it
+                # without scanning; the index lives as long as its newest entry
+                index = _index_key(key_prefix)
+                try:
+                    async with redis.pipeline(transaction=False) as pipe:
+                        pipe.setex(key, ttl, adapter.dump_json(result))
+                        pipe.sadd(index, key)
+                        pipe.expire(index, ttl)
+                        await pipe.execute()
+                except RedisError:
+                    pass
+
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+async def invalidate(*prefixes: str):
+    """Delete every cached entry stored under the given key prefixes."""
+    try:
+        redis = await get_redis()
+        async with redis.pipeline(transaction=False) as pipe:
+            for prefix in prefixes:
+                pipe.smembers(_index_key(prefix))
+            members = await pipe.execute()
+
+        keys = [key for keys in members for key in keys]
+        await redis.delete(*keys, *(_index_key(prefix) for prefix in prefixes))
+    except RedisError:
+        pass
+
+
+def make_etag(data: bytes) -> str:
+    """Build a strong ETag from response bytes or another version marker."""
+    return f'"{hashlib.md5(data).hexdigest()}"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """Check whether the client's If-None-Match already holds this ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = {tag.strip() for tag in if_none_match.split(",")}
+    return etag in tags or "*" in tags
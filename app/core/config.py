@@ -1,4 +1,5 @@
 import json
+from functools import cached_property, lru_cache
 from typing import List
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -20,13 +21,22 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
     TEST_DATABASE_URL: str | None = None
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: int = 30
+    # Set when an external pooler such as PgBouncer (transaction mode) owns the pool
+    DB_USE_NULL_POOL: bool = False
+    DB_QUERY_CACHE_SIZE: int = 1200
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_MAX_CONNECTIONS: int = 64
 
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
+    CELERY_CONCURRENCY: int = 8
 
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8000"]
@@ -37,7 +47,7 @@ class Settings(BaseSettings):
         extra="ignore"
     )
 
-    @property
+    @cached_property
     def cors_origins(self) -> List[str]:
         """Parse CORS origins if stored as JSON string."""
         if isinstance(self.BACKEND_CORS_ORIGINS, str):
@@ -48,5 +58,11 @@ class Settings(BaseSettings):
         return self.BACKEND_CORS_ORIGINS
 
 
+@lru_cache
+def get_settings() -> Settings:
+    """Return the process-wide settings, parsed from the environment once."""
+    return Settings()
+
+
 # Global settings instance
-settings = Settings()
+settings = get_settings()
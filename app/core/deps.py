@@ -2,12 +2,12 @@ from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import decode_token
 from app.db.models import User
 from app.db.session import get_db
+from app.services.redis_service import cache_user, get_auth_state
 
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -50,13 +50,22 @@ async def get_current_user(
     except ValueError:
         raise credentials_exception
 
+    # Reject logged-out tokens before touching the database, and serve
+    # from the short-lived Redis snapshot when possible (one round trip)
+    revoked, user = await get_auth_state(payload.get("jti"), user_id)
+    if revoked:
+        raise credentials_exception
+    if user is not None:
+        return user
+
     # Fetch user from database
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await db.get(User, user_id)
 
     if user is None:
         raise credentials_exception
 
+    await cache_user(user)
+
     return user
 
 
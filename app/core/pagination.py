@@ -0,0 +1,35 @@
+import base64
+import json
+from datetime import datetime, timezone
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(timestamp: datetime, row_id: UUID) -> str:
+    """Encode the (timestamp, id) sort key of a row into an opaque cursor."""
+    raw = json.dumps([timestamp.isoformat(), str(row_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by encode_cursor.
+    Raises HTTPException if the cursor is malformed.
+
+    Timestamps carrying an offset are converted to naive UTC, matching the
+    columns they are compared against.
+    """
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(timestamp, str) or not isinstance(row_id, str):
+            raise TypeError("cursor fields must be strings")
+        decoded = datetime.fromisoformat(timestamp)
+        if decoded.tzinfo is not None:
+            decoded = decoded.astimezone(timezone.utc).replace(tzinfo=None)
+        return decoded, UUID(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
@@ -1,5 +1,12 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import time
 from datetime import datetime, timedelta
 from typing import Any
+from uuid import uuid4
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -9,6 +16,12 @@ from app.core.config import settings
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Encoded header python-jose writes on HS256 tokens. Tokens starting with it
+# are verified directly, skipping the header parse and JOSE key handling.
+_HS256_PREFIX = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b"=").decode() + "."
+# Claims only python-jose validates; tokens carrying them take the full path
+_JOSE_ONLY_CLAIMS = ("nbf", "iat", "aud", "iss", "sub_jwk", "at_hash")
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password."""
@@ -20,6 +33,16 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in a worker thread so bcrypt doesn't block the event loop."""
+    return await asyncio.to_thread(verify_password, plain_password, hashed_password)
+
+
+async def aget_password_hash(password: str) -> str:
+    """Hash a password in a worker thread so bcrypt doesn't block the event loop."""
+    return await asyncio.to_thread(get_password_hash, password)
+
+
 def create_access_token(data: dict[str, Any], expires_delta: timedelta | None = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -28,7 +51,7 @@ def create_access_token(data: dict[str, Any], expires_delta: timedelta | None =
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    to_encode.update({"exp": expire, "type": "access"})
+    to_encode.update({"exp": expire, "type": "access", "jti": uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -37,15 +60,66 @@ def create_refresh_token(data: dict[str, Any]) -> str:
     """Create a JWT refresh token."""
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
-def decode_token(token: str) -> dict[str, Any] | None:
-    """Decode and verify a JWT token."""
+def _b64url_decode(segment: str) -> bytes:
+    """Decode unpadded base64url, as used in JWT segments."""
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _b64url_encode(data: bytes) -> str:
+    """Encode bytes as unpadded base64url."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _decode_hs256(token: str) -> dict[str, Any] | None:
+    """
+    Verify an HS256 token with the standard library.
+
+    Checks the signature and expiry the same way jwt.decode does for the
+    tokens this app issues; anything with other registered claims is
+    handed to python-jose.
+    """
+    signing_input, _, signature = token.rpartition(".")
+    if signing_input.count(".") != 1:
+        return None
+
+    expected = hmac.new(settings.SECRET_KEY.encode(), signing_input.encode(), hashlib.sha256).digest()
+    if not signature.isascii() or not hmac.compare_digest(signature, _b64url_encode(expected)):
+        return None
+
+    try:
+        payload = json.loads(_b64url_decode(signing_input.partition(".")[2]))
+    except ValueError:
+        return None
+    if not isinstance(payload, dict):
+        return None
+
+    if any(claim in payload for claim in _JOSE_ONLY_CLAIMS):
+        return _decode_with_jose(token)
+
+    if "exp" in payload:
+        exp = payload["exp"]
+        if not isinstance(exp, int) or exp < int(time.time()):
+            return None
+
+    return payload
+
+
+def _decode_with_jose(token: str) -> dict[str, Any] | None:
+    """Decode and verify a token through python-jose."""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
     except JWTError:
         return None
+
+
+def decode_token(token: str) -> dict[str, Any] | None:
+    """Decode and verify a JWT token."""
+    if settings.ALGORITHM == "HS256" and token.startswith(_HS256_PREFIX):
+        return _decode_hs256(token)
+    return _decode_with_jose(token)
@@ -2,7 +2,18 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+)
 from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
 from sqlalchemy.orm import relationship
@@ -10,6 +21,11 @@ from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 
+def utcnow_sql():
+    """Current UTC time as a naive timestamp, evaluated by PostgreSQL."""
+    return func.timezone("utc", func.now())
+
+
 class DifficultyEnum(str, enum.Enum):
     """Challenge difficulty levels."""
     EASY = "easy"
@@ -35,6 +51,9 @@ class User(Base):
     password_hash = Column(String(255), nullable=False)
     total_xp = Column(Integer, default=0, nullable=False, index=True)
     level = Column(Integer, default=1, nullable=False)
+    # Denormalized counters, kept in step with attempts/user_badges on write
+    total_challenges_passed = Column(Integer, default=0, server_default="0", nullable=False)
+    total_badges = Column(Integer, default=0, server_default="0", nullable=False)
     profile = Column(JSONB, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
@@ -56,6 +75,17 @@ class Challenge(Base):
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     published = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Keyset pagination over published challenges, newest first
+        Index(
+            "ix_challenges_published_created_at_id",
+            created_at.desc(),
+            id.desc(),
+            postgresql_where=published,
+        ),
+    )
 
     # Relationships
     attempts = relationship("Attempt", back_populates="challenge", cascade="all, delete-orphan")
@@ -66,18 +96,40 @@ class Attempt(Base):
     __tablename__ = "attempts"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     challenge_id = Column(UUID(as_uuid=True), ForeignKey("challenges.id"), nullable=False, index=True)
     status = Column(SQLEnum(AttemptStatusEnum), default=AttemptStatusEnum.STARTED, nullable=False)
     score = Column(Float, nullable=True)
     xp_awarded = Column(Integer, default=0, nullable=False)
-    started_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, server_default=utcnow_sql(), nullable=False)
     submitted_at = Column(DateTime, nullable=True)
     attempt_metadata = Column(JSONB, nullable=True)
 
+    __table_args__ = (
+        # Keyset pagination over a user's attempts, newest first
+        Index("ix_attempts_user_id_started_at_id", user_id, started_at.desc(), id.desc()),
+        # A user's attempts at one challenge, newest first (challenge detail page)
+        Index(
+            "ix_attempts_user_id_challenge_id_started_at",
+            user_id,
+            challenge_id,
+            started_at.desc(),
+        ),
+        # Per-status attempt counts for badge checks (index-only scan)
+        Index("ix_attempts_user_id_status", user_id, status),
+        # Passed attempts per user (badge checks, streaks)
+        Index(
+            "ix_attempts_user_id_passed",
+            user_id,
+            submitted_at,
+            postgresql_where=status == AttemptStatusEnum.PASSED,
+        ),
+    )
+
     # Relationships
     user = relationship("User", back_populates="attempts")
-    challenge = relationship("Challenge", back_populates="attempts")
+    # Must be loaded explicitly (selectinload/joinedload); a lazy load raises
+    challenge = relationship("Challenge", back_populates="attempts", lazy="raise")
 
 
 class Badge(Base):
@@ -105,6 +157,11 @@ class UserBadge(Base):
     awarded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     badge_metadata = Column(JSONB, nullable=True)
 
+    __table_args__ = (
+        # A user's badges, most recent first
+        Index("ix_user_badges_user_id_awarded_at", user_id, awarded_at.desc()),
+    )
+
     # Relationships
     user = relationship("User", back_populates="badges")
     badge = relationship("Badge", back_populates="user_badges")
@@ -1,13 +1,41 @@
+from uuid import uuid4
+
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
 
+# Pool sizing only applies when SQLAlchemy owns the pool; behind
+# PgBouncer every session opens (and returns) a pooler connection
+if settings.DB_USE_NULL_POOL:
+    # Prepared statements do not survive transaction-mode pooling: turn off
+    # both asyncpg's and SQLAlchemy's statement caches, and give statements
+    # unique names so they never clash across server connections
+    pool_options = {
+        "poolclass": NullPool,
+        "connect_args": {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        },
+    }
+else:
+    pool_options = {
+        "pool_pre_ping": True,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
     future=True,
-    pool_pre_ping=True,
+    **pool_options,
+    # Compiled SQL cache; the default of 500 is small for the number of distinct statements
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE,
 )
 
 # Create async session factory
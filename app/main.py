@@ -1,17 +1,20 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.api.v1 import attempts, auth, badges, challenges, leaderboard
-from app.core.config import settings
+from app.core.config import Settings, get_settings, settings
 from app.web import auth as web_auth
 from app.web import routes as web_routes
+from app.web.middleware import WebAuthMiddleware
 
 app = FastAPI(
     title=settings.APP_NAME,
     debug=settings.DEBUG,
     version="1.0.0",
-    description="A gamification platform where users complete challenges to earn XP and badges"
+    description="A gamification platform where users complete challenges to earn XP and badges",
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -23,27 +26,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Cookie authentication for the web frontend
+app.add_middleware(WebAuthMiddleware)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 
 @app.get("/health", tags=["Health"])
-async def health_check():
+async def health_check(app_settings: Settings = Depends(get_settings)):
     """Health check endpoint."""
     return {
         "status": "healthy",
-        "app": settings.APP_NAME,
+        "app": app_settings.APP_NAME,
         "version": "1.0.0"
     }
 
 
-# Include API routers (with /api prefix to distinguish from web routes)
-app.include_router(auth.router, prefix="/api/auth", tags=["API Authentication"])
-app.include_router(challenges.router, prefix="/api/challenges", tags=["API Challenges"])
-app.include_router(attempts.router, prefix="/api/attempts", tags=["API Attempts"])
-app.include_router(badges.router, prefix="/api/badges", tags=["API Badges"])
-app.include_router(leaderboard.router, prefix="/api", tags=["API Leaderboard"])
+# Each router is registered exactly once: API routers under /api,
+# web frontend routers (which serve HTML) without a prefix
+ROUTERS = (
+    (auth.router, "/api/auth", "API Authentication"),
+    (challenges.router, "/api/challenges", "API Challenges"),
+    (attempts.router, "/api/attempts", "API Attempts"),
+    (badges.router, "/api/badges", "API Badges"),
+    (leaderboard.router, "/api", "API Leaderboard"),
+    (web_auth.router, "", "Web Authentication"),
+    (web_routes.router, "", "Web Pages"),
+)
 
-# Include web frontend routers (no prefix - these serve HTML)
-app.include_router(web_auth.router, tags=["Web Authentication"])
-app.include_router(web_routes.router, tags=["Web Pages"])
+for router, prefix, tag in ROUTERS:
+    app.include_router(router, prefix=prefix, tags=[tag])
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any
+from typing import Any, List
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -38,3 +38,9 @@ class AttemptWithChallenge(AttemptResponse):
     """Attempt response with challenge details."""
     challenge_title: str
     challenge_xp: int
+
+
+class AttemptPage(BaseModel):
+    """Schema for a page of attempts with a cursor to the next page."""
+    items: List[AttemptResponse]
+    next_cursor: str | None = None
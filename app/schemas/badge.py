@@ -26,6 +26,15 @@ class BadgeResponse(BadgeBase):
     model_config = {"from_attributes": True}
 
 
+class BadgeRule(BaseModel):
+    """Cached badge fields needed to evaluate award conditions."""
+    id: UUID
+    name: str
+    condition: dict[str, Any]
+
+    model_config = {"from_attributes": True}
+
+
 class UserBadgeResponse(BaseModel):
     """Schema for user's earned badge."""
     id: UUID
@@ -37,13 +37,20 @@ class ChallengeResponse(ChallengeBase):
     created_by: UUID | None = None
     published: bool
     created_at: datetime
+    updated_at: datetime
 
     model_config = {"from_attributes": True}
 
 
+class ChallengePage(BaseModel):
+    """Schema for a page of challenges with a cursor to the next page."""
+    items: List[ChallengeResponse]
+    next_cursor: str | None = None
+
+
 class ChallengeListParams(BaseModel):
     """Query parameters for listing challenges."""
     difficulty: DifficultyEnum | None = None
     tags: List[str] | None = None
-    skip: int = Field(0, ge=0)
+    cursor: str | None = None
     limit: int = Field(10, ge=1, le=100)
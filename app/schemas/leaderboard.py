@@ -1,7 +1,7 @@
 from typing import List
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class LeaderboardEntry(BaseModel):
@@ -19,6 +19,10 @@ class LeaderboardResponse(BaseModel):
     total_count: int
 
 
+# Shared (de)serializer for the precomputed leaderboard entries in Redis
+LEADERBOARD_LIST_ADAPTER = TypeAdapter(List[LeaderboardEntry])
+
+
 class UserProgress(BaseModel):
     """Schema for user progress/stats."""
     user_id: UUID
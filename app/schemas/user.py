@@ -22,8 +22,12 @@ class UserLogin(BaseModel):
     password: str
 
 
-class UserResponse(UserBase):
+class UserResponse(BaseModel):
     """Schema for user response (public info)."""
+    # Built from stored rows whose email was validated on registration,
+    # so outputs skip the EmailStr check
+    username: str
+    email: str
     id: UUID
     total_xp: int
     level: int
@@ -39,6 +43,21 @@ class UserProfile(UserResponse):
     model_config = {"from_attributes": True}
 
 
+class UserSnapshot(BaseModel):
+    """Cached copy of the user fields read by authenticated routes."""
+    id: UUID
+    username: str
+    email: str
+    total_xp: int
+    level: int
+    total_challenges_passed: int
+    total_badges: int
+    profile: dict[str, Any] | None = None
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
 class Token(BaseModel):
     """Schema for authentication token response."""
     access_token: str
@@ -1,10 +1,56 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List
 
-from sqlalchemy import func, select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import Attempt, AttemptStatusEnum, Badge, UserBadge
+from app.db.models import Attempt, AttemptStatusEnum, Badge, User, UserBadge
+from app.services.redis_service import get_all_badges_cached
+
+# Badge conditions name statuses by value ("passed"); resolve them by lookup
+_STATUS = {status.value: status for status in AttemptStatusEnum}
+
+
+def _eval_xp(condition: dict, context: dict) -> bool:
+    return context["total_xp"] >= condition.get("threshold", 0)
+
+
+def _eval_attempt_count(condition: dict, context: dict) -> bool:
+    status = _STATUS.get(condition.get("status", "passed"))
+    return context["attempt_counts"].get(status, 0) >= condition.get("count", 1)
+
+
+def _eval_consecutive_days(condition: dict, context: dict) -> bool:
+    # This is a simplified check - in production, you'd track daily activity.
+    # For now, we count the distinct days with passed attempts
+    return context["unique_days"] >= condition.get("days", 7)
+
+
+# Condition type -> pure evaluator over the precomputed user context
+EVALUATORS = {
+    "xp": _eval_xp,
+    "attempt_count": _eval_attempt_count,
+    "consecutive_days": _eval_consecutive_days,
+}
+
+
+def filter_qualifying_badges(badges: List[Badge], context: dict) -> List[Badge]:
+    """
+    Select the badges whose condition the user meets.
+
+    Args:
+        badges: Candidate badges
+        context: Precomputed user stats: total_xp, attempt_counts (by status)
+            and unique_days
+
+    Returns:
+        Badges whose condition holds; unknown condition types never match
+    """
+    return [
+        badge for badge in badges
+        if (evaluate := EVALUATORS.get(badge.condition.get("type"))) is not None
+        and evaluate(badge.condition, context)
+    ]
 
 
 async def evaluate_badge_conditions(
@@ -28,62 +74,38 @@ async def evaluate_badge_conditions(
     Returns:
         List of badges the user qualifies for but hasn't received yet
     """
-    # Get all badges
-    result = await db.execute(select(Badge))
-    all_badges = result.scalars().all()
-
-    # Get badges user already has
+    # Get badges the user hasn't earned yet (the badge list itself is cached)
     result = await db.execute(
         select(UserBadge.badge_id).where(UserBadge.user_id == user_id)
     )
-    earned_badge_ids = {row for row in result.scalars().all()}
-
-    badges_to_award = []
-
-    for badge in all_badges:
-        # Skip if user already has this badge
-        if badge.id in earned_badge_ids:
-            continue
-
-        condition = badge.condition
-        condition_type = condition.get("type")
-
-        # Evaluate based on condition type
-        if condition_type == "xp":
-            threshold = condition.get("threshold", 0)
-            if user_total_xp >= threshold:
-                badges_to_award.append(badge)
+    earned_badge_ids = set(result.scalars().all())
+    unearned_badges = [
+        badge for badge in await get_all_badges_cached(db)
+        if badge.id not in earned_badge_ids
+    ]
 
-        elif condition_type == "attempt_count":
-            count_required = condition.get("count", 1)
-            status_filter = condition.get("status", "passed")
-
-            # Count attempts matching criteria
-            query = select(func.count(Attempt.id)).where(
-                Attempt.user_id == user_id,
-                Attempt.status == AttemptStatusEnum(status_filter)
-            )
-            result = await db.execute(query)
-            attempt_count = result.scalar()
-
-            if attempt_count >= count_required:
-                badges_to_award.append(badge)
-
-        elif condition_type == "consecutive_days":
-            days_required = condition.get("days", 7)
-            # This is a simplified check - in production, you'd track daily activity
-            # For now, we'll check if user has attempts on different days
-            query = select(func.date(Attempt.submitted_at)).where(
-                Attempt.user_id == user_id,
-                Attempt.status == AttemptStatusEnum.PASSED
-            ).distinct()
-            result = await db.execute(query)
-            unique_days = len(result.all())
+    # Aggregate the user's attempts once; every condition is then a lookup
+    result = await db.execute(
+        select(Attempt.status, func.count(Attempt.id))
+        .where(Attempt.user_id == user_id)
+        .group_by(Attempt.status)
+    )
+    attempt_counts = dict(result.all())
 
-            if unique_days >= days_required:
-                badges_to_award.append(badge)
+    result = await db.execute(
+        select(func.count(func.distinct(func.date(Attempt.submitted_at)))).where(
+            Attempt.user_id == user_id,
+            Attempt.status == AttemptStatusEnum.PASSED
+        )
+    )
+    unique_days = result.scalar()
 
-    return badges_to_award
+    context = {
+        "total_xp": user_total_xp,
+        "attempt_counts": attempt_counts,
+        "unique_days": unique_days,
+    }
+    return filter_qualifying_badges(unearned_badges, context)
 
 
 async def award_badge(
@@ -104,15 +126,46 @@ async def award_badge(
     Returns:
         UserBadge instance
     """
-    user_badge = UserBadge(
-        user_id=user_id,
-        badge_id=badge.id,
-        awarded_at=datetime.utcnow(),
-        metadata=metadata
-    )
+    user_badges = await award_badges_bulk(user_id, [badge], db, metadata)
+    return user_badges[0]
+
 
-    db.add(user_badge)
+async def award_badges_bulk(
+    user_id,
+    badges: List[Badge],
+    db: AsyncSession,
+    metadata: dict = None
+) -> List[UserBadge]:
+    """
+    Award several badges to a user in a single transaction.
+
+    Args:
+        user_id: User's UUID
+        badges: Badges to award
+        db: Database session
+        metadata: Optional metadata about the awards
+
+    Returns:
+        List of UserBadge instances
+    """
+    # One timestamp for the whole batch; columns store naive UTC
+    awarded_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    user_badges = [
+        UserBadge(
+            user_id=user_id,
+            badge_id=badge.id,
+            awarded_at=awarded_at,
+            badge_metadata=metadata
+        )
+        for badge in badges
+    ]
+
+    db.add_all(user_badges)
+    await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(total_badges=User.total_badges + len(user_badges))
+    )
     await db.commit()
-    await db.refresh(user_badge)
 
-    return user_badge
+    return user_badges
@@ -1,39 +1,95 @@
-from typing import List, Tuple
+import time
+from typing import Dict, List, Tuple
 from uuid import UUID
 
 import redis.asyncio as aioredis
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.db.models import Badge, User
+from app.schemas.badge import BadgeRule
+from app.schemas.user import UserSnapshot
+
+_badge_rules_adapter = TypeAdapter(List[BadgeRule])
+
+# Shared connection pool; callers wait for a free connection when it is exhausted
+redis_pool = aioredis.BlockingConnectionPool.from_url(
+    settings.REDIS_URL,
+    encoding="utf-8",
+    decode_responses=True,
+    max_connections=settings.REDIS_MAX_CONNECTIONS
+)
 
 # Redis client instance
-redis_client = None
+redis_client = aioredis.Redis(connection_pool=redis_pool)
+
+# Precomputed top of the leaderboard; dropped whenever scores change and
+# rebuilt by the next leaderboard read
+LEADERBOARD_SNAPSHOT_KEY = "leaderboard:top100:entries"
+LEADERBOARD_SNAPSHOT_SIZE = 100
+LEADERBOARD_SNAPSHOT_TTL = 300
+
+
+# Top N of the leaderboard with each user's stored details, in one round trip.
+# Returns a flat list of user_id, score, [field, value, ...] triples.
+_leaderboard_script = redis_client.register_script("""
+local ids = redis.call('ZREVRANGE', KEYS[1], 0, ARGV[1] - 1, 'WITHSCORES')
+local out = {}
+for i = 1, #ids, 2 do
+    table.insert(out, ids[i])
+    table.insert(out, ids[i + 1])
+    table.insert(out, redis.call('HGETALL', 'lbuser:' .. ids[i]))
+end
+return out
+""")
 
 
 async def get_redis():
     """Get Redis client instance."""
-    global redis_client
-    if redis_client is None:
-        redis_client = await aioredis.from_url(
-            settings.REDIS_URL,
-            encoding="utf-8",
-            decode_responses=True
-        )
     return redis_client
 
 
-async def update_leaderboard(user_id: UUID, total_xp: int):
+async def update_leaderboard(user_id: UUID, total_xp: int, username: str, level: int):
     """
     Update user's position in the leaderboard.
 
+    The username and level are stored next to the score so leaderboard
+    reads don't need to look users up in the database. The precomputed
+    snapshot is dropped so reads fall back to the live sorted set.
+
     Args:
         user_id: User's UUID
         total_xp: User's total XP
+        username: User's username
+        level: User's level
     """
     redis = await get_redis()
-    await redis.zadd("leaderboard", {str(user_id): total_xp})
+    async with redis.pipeline() as pipe:
+        pipe.zadd("leaderboard", {str(user_id): total_xp})
+        pipe.hset(f"lbuser:{user_id}", mapping={"username": username, "level": level})
+        pipe.delete(LEADERBOARD_SNAPSHOT_KEY)
+        await pipe.execute()
 
 
-async def get_leaderboard(limit: int = 10) -> List[Tuple[str, float]]:
+async def remove_from_leaderboard(user_id: UUID):
+    """
+    Remove a user and their stored details from the leaderboard,
+    dropping the precomputed snapshot that may still list them.
+
+    Args:
+        user_id: User's UUID
+    """
+    redis = await get_redis()
+    async with redis.pipeline() as pipe:
+        pipe.zrem("leaderboard", str(user_id))
+        pipe.delete(f"lbuser:{user_id}", LEADERBOARD_SNAPSHOT_KEY)
+        await pipe.execute()
+
+
+async def get_leaderboard(limit: int = 10) -> List[Tuple[str, float, Dict[str, str]]]:
     """
     Get top users from leaderboard.
 
@@ -41,12 +97,41 @@ async def get_leaderboard(limit: int = 10) -> List[Tuple[str, float]]:
         limit: Number of top users to retrieve
 
     Returns:
-        List of (user_id, score) tuples
+        List of (user_id, score, details) tuples, where details holds the
+        stored username and level (empty if none were stored)
+    """
+    # Highest scores first, with details, evaluated server-side
+    results = await _leaderboard_script(keys=["leaderboard"], args=[limit])
+
+    return [
+        (user_id, float(score), dict(zip(fields[::2], fields[1::2])))
+        for user_id, score, fields in zip(results[::3], results[1::3], results[2::3])
+    ]
+
+
+async def get_leaderboard_snapshot() -> str | None:
+    """
+    Get the precomputed top of the leaderboard.
+
+    Returns:
+        JSON list of LeaderboardEntry, or None if it was dropped or expired
     """
     redis = await get_redis()
-    # ZREVRANGE returns highest scores first
-    results = await redis.zrevrange("leaderboard", 0, limit - 1, withscores=True)
-    return results
+    return await redis.get(LEADERBOARD_SNAPSHOT_KEY)
+
+
+async def cache_leaderboard_snapshot(snapshot: bytes):
+    """
+    Store a rebuilt top of the leaderboard unless another reader already did.
+
+    Args:
+        snapshot: JSON list of LeaderboardEntry
+    """
+    try:
+        redis = await get_redis()
+        await redis.set(LEADERBOARD_SNAPSHOT_KEY, snapshot, ex=LEADERBOARD_SNAPSHOT_TTL, nx=True)
+    except RedisError:
+        pass
 
 
 async def get_user_rank(user_id: UUID) -> int | None:
@@ -66,9 +151,158 @@ async def get_user_rank(user_id: UUID) -> int | None:
     return None
 
 
+async def cache_user(user: User, ttl: int = 60):
+    """
+    Cache the fields of a user needed by authenticated routes.
+
+    Args:
+        user: User to cache
+        ttl: Time to live in seconds
+    """
+    snapshot = UserSnapshot.model_validate(user)
+    try:
+        redis = await get_redis()
+        await redis.setex(f"user:{user.id}", ttl, snapshot.model_dump_json())
+    except RedisError:
+        pass
+
+
+async def invalidate_cached_user(user_id: UUID):
+    """
+    Drop a user's cached snapshot after it changes.
+
+    Args:
+        user_id: User's UUID
+    """
+    try:
+        redis = await get_redis()
+        await redis.delete(f"user:{user_id}")
+    except RedisError:
+        pass
+
+
+async def invalidate_cached_users(user_ids: List[UUID]):
+    """
+    Drop the cached snapshots of several users in one round trip.
+
+    Args:
+        user_ids: Users' UUIDs
+    """
+    if not user_ids:
+        return
+    try:
+        redis = await get_redis()
+        await redis.delete(*(f"user:{user_id}" for user_id in user_ids))
+    except RedisError:
+        pass
+
+
+async def get_all_badges_cached(db: AsyncSession, ttl: int = 300) -> List[Badge]:
+    """
+    Get every badge's id, name and condition, cached for badge evaluation.
+
+    Args:
+        db: Database session used to load the badges on a cache miss
+        ttl: Time to live in seconds
+
+    Returns:
+        Detached Badge instances carrying id, name and condition
+    """
+    try:
+        redis = await get_redis()
+        cached = await redis.get("badges:all")
+    except RedisError:
+        redis, cached = None, None
+
+    if cached is not None:
+        rules = _badge_rules_adapter.validate_json(cached)
+    else:
+        result = await db.execute(select(Badge.id, Badge.name, Badge.condition))
+        rules = _badge_rules_adapter.validate_python(result.all(), from_attributes=True)
+        if redis is not None:
+            try:
+                await redis.setex("badges:all", ttl, _badge_rules_adapter.dump_json(rules))
+            except RedisError:
+                pass
+
+    return [Badge(**rule.model_dump()) for rule in rules]
+
+
+async def invalidate_badges_cache():
+    """Drop the cached badge list after badges change."""
+    try:
+        redis = await get_redis()
+        await redis.delete("badges:all")
+    except RedisError:
+        pass
+
+
+async def revoke_token(jti: str, expires_at: int):
+    """
+    Mark a token as revoked until it would have expired anyway.
+
+    Args:
+        jti: Token's unique identifier
+        expires_at: Token's exp claim (Unix timestamp)
+    """
+    ttl = expires_at - int(time.time())
+    if ttl <= 0:
+        return
+    try:
+        redis = await get_redis()
+        await redis.setex(f"revoked:{jti}", ttl, 1)
+    except RedisError:
+        pass
+
+
+async def is_token_revoked(jti: str) -> bool:
+    """
+    Check whether a token has been revoked.
+
+    Args:
+        jti: Token's unique identifier
+
+    Returns:
+        True if the token was revoked, False otherwise (or if Redis is down)
+    """
+    try:
+        redis = await get_redis()
+        return bool(await redis.exists(f"revoked:{jti}"))
+    except RedisError:
+        return False
+
+
+async def get_auth_state(jti: str | None, user_id: UUID) -> Tuple[bool, User | None]:
+    """
+    Check a token's revocation and fetch the cached user in one round trip.
+
+    Args:
+        jti: Token's unique identifier, if it carries one
+        user_id: User's UUID from the token
+
+    Returns:
+        (revoked, user) where user is a detached snapshot or None on a miss;
+        (False, None) if Redis is down
+    """
+    try:
+        redis = await get_redis()
+        async with redis.pipeline(transaction=False) as pipe:
+            if jti is not None:
+                pipe.exists(f"revoked:{jti}")
+            pipe.get(f"user:{user_id}")
+            *revoked, cached = await pipe.execute()
+    except RedisError:
+        return False, None
+
+    if revoked and revoked[0]:
+        return True, None
+    if cached is None:
+        return False, None
+
+    snapshot = UserSnapshot.model_validate_json(cached)
+    return False, User(**snapshot.model_dump())
+
+
 async def close_redis():
-    """Close Redis connection."""
-    global redis_client
-    if redis_client:
-        await redis_client.close()
-        redis_client = None
+    """Close Redis connections."""
+    await redis_pool.disconnect()
@@ -1,4 +1,8 @@
 import math
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 def calculate_xp_awarded(challenge_xp: int, score: float) -> int:
@@ -29,7 +33,29 @@ def calculate_level(total_xp: int) -> int:
     """
     if total_xp <= 0:
         return 1
-    return int(math.sqrt(total_xp / 100)) + 1
+    # Integer square root: exact at perfect squares, no float round-trip
+    return math.isqrt(total_xp // 100) + 1
+
+
+def calculate_levels_bulk(total_xps) -> "np.ndarray":
+    """
+    Calculate levels for many users at once (e.g. after a formula change).
+
+    Vectorized form of calculate_level with the same formula.
+
+    Args:
+        total_xps: Sequence or array of users' total XP
+
+    Returns:
+        Array of levels, aligned with the input
+    """
+    # Only the offline recalculation script needs numpy; importing it here
+    # keeps it out of the web, API and worker processes
+    import numpy as np
+
+    xps = np.asarray(total_xps, dtype=np.int64)
+    levels = np.sqrt(np.maximum(xps, 0) / 100).astype(np.int64) + 1
+    return levels
 
 
 def calculate_next_level_xp(current_level: int) -> int:
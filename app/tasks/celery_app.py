@@ -0,0 +1,25 @@
+from celery import Celery
+
+from app.core.config import settings
+
+# Create Celery app
+# (kept free of task/database imports so the API can enqueue by name cheaply)
+celery_app = Celery(
+    "skillquest",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    result_serializer="json",
+    timezone="UTC",
+    enable_utc=True,
+    # Task side effects live in Postgres/Redis; nothing reads the results
+    task_ignore_result=True,
+    task_acks_late=True,
+    worker_concurrency=settings.CELERY_CONCURRENCY,
+    # XP/badge awards get their own queue so they scale independently
+    task_routes={"award_xp_and_badges": {"queue": "xp"}},
+)
@@ -1,40 +1,50 @@
+from typing import List
 from uuid import UUID
 
 import redis
-from celery import Celery
-from sqlalchemy import create_engine
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, update
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
 from app.db.models import Attempt, AttemptStatusEnum, Challenge, User
+from app.schemas.badge import BadgeRule
+from app.services.badge_service import filter_qualifying_badges
+from app.services.redis_service import LEADERBOARD_SNAPSHOT_KEY
 from app.services.xp_service import calculate_level, calculate_xp_awarded, is_passing_score
+from app.tasks.celery_app import celery_app
 
-# Create Celery app
-celery_app = Celery(
-    "skillquest",
-    broker=settings.CELERY_BROKER_URL,
-    backend=settings.CELERY_RESULT_BACKEND
-)
-
-celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
-    timezone="UTC",
-    enable_utc=True,
-)
+_badge_rules_adapter = TypeAdapter(List[BadgeRule])
 
 # Create synchronous database session for Celery tasks
 # (Celery doesn't work well with async code, so we use sync SQLAlchemy)
 sync_db_url = settings.DATABASE_URL.replace("+asyncpg", "")
-sync_engine = create_engine(sync_db_url, pool_pre_ping=True)
+# psycopg2 has no server-side prepared statements, so behind PgBouncer
+# only the pool itself needs to change
+if settings.DB_USE_NULL_POOL:
+    sync_pool_options = {"poolclass": NullPool}
+else:
+    sync_pool_options = {
+        "pool_pre_ping": True,
+        "pool_size": settings.CELERY_CONCURRENCY,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+sync_engine = create_engine(sync_db_url, **sync_pool_options)
 SyncSessionLocal = sessionmaker(bind=sync_engine, autocommit=False, autoflush=False)
 
-# Redis client for leaderboard
-redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+# Redis client for leaderboard, sharing one pool across the worker's threads
+redis_pool = redis.BlockingConnectionPool.from_url(
+    settings.REDIS_URL,
+    decode_responses=True,
+    max_connections=settings.CELERY_CONCURRENCY * 2
+)
+redis_client = redis.Redis(connection_pool=redis_pool)
 
 
-@celery_app.task(name="award_xp_and_badges")
+@celery_app.task(name="award_xp_and_badges", ignore_result=True, acks_late=True)
 def award_xp_and_badges(attempt_id: str):
     """
     Background task to award XP and badges after an attempt is submitted.
@@ -45,49 +55,83 @@ def award_xp_and_badges(attempt_id: str):
     db = SyncSessionLocal()
 
     try:
-        # Load attempt with related challenge
+        # Load attempt together with its challenge's XP in one query, locking
+        # the attempt so a concurrent redelivery waits and then sees it graded
         attempt_uuid = UUID(attempt_id)
-        attempt = db.query(Attempt).filter(Attempt.id == attempt_uuid).first()
-
-        if not attempt:
+        row = (
+            db.query(Attempt, Challenge.xp)
+            .join(Challenge, Challenge.id == Attempt.challenge_id)
+            .filter(Attempt.id == attempt_uuid)
+            .with_for_update(of=Attempt)
+            .first()
+        )
+
+        if not row:
             print(f"Attempt {attempt_id} not found")
             return
 
-        # Load challenge
-        challenge = db.query(Challenge).filter(Challenge.id == attempt.challenge_id).first()
+        attempt, challenge_xp = row
 
-        if not challenge:
-            print(f"Challenge {attempt.challenge_id} not found")
+        # A redelivered task (late acks) must not award XP twice
+        if attempt.status != AttemptStatusEnum.SUBMITTED:
+            print(f"Attempt {attempt_id} already processed")
             return
 
         # Calculate XP awarded
-        xp_awarded = calculate_xp_awarded(challenge.xp, attempt.score or 0)
+        xp_awarded = calculate_xp_awarded(challenge_xp, attempt.score or 0)
         attempt.xp_awarded = xp_awarded
 
         # Determine if passing
         passing = is_passing_score(attempt.score or 0)
         attempt.status = AttemptStatusEnum.PASSED if passing else AttemptStatusEnum.FAILED
 
-        # Update user's total XP (atomic operation)
+        # Update user's total XP (atomic increment, safe under concurrent tasks)
+        total_xp = None
         if passing:
-            user = db.query(User).filter(User.id == attempt.user_id).first()
-            if user:
-                user.total_xp += xp_awarded
-                user.level = calculate_level(user.total_xp)
-
-                # Update leaderboard in Redis
-                redis_client.zadd("leaderboard", {str(user.id): user.total_xp})
-
-                print(f"Awarded {xp_awarded} XP to user {user.id}. Total XP: {user.total_xp}, Level: {user.level}")
+            result = db.execute(
+                update(User)
+                .where(User.id == attempt.user_id)
+                .values(
+                    total_xp=User.total_xp + xp_awarded,
+                    total_challenges_passed=User.total_challenges_passed + 1
+                )
+                .returning(User.total_xp, User.level, User.username)
+            ).one_or_none()
+
+            if result:
+                total_xp, level, username = result
+                new_level = calculate_level(total_xp)
+                if new_level != level:
+                    db.execute(
+                        update(User).where(User.id == attempt.user_id).values(level=new_level)
+                    )
+
+                print(f"Awarded {xp_awarded} XP to user {attempt.user_id}. Total XP: {total_xp}, Level: {new_level}")
 
                 # Check for badges (synchronously evaluate conditions)
-                badges_to_award = evaluate_badge_conditions_sync(user.id, user.total_xp, db)
+                badges_to_award = evaluate_badge_conditions_sync(attempt.user_id, total_xp, db)
 
-                for badge in badges_to_award:
-                    award_badge_sync(user.id, badge, db)
-                    print(f"Awarded badge '{badge.name}' to user {user.id}")
+                if badges_to_award:
+                    award_badges_bulk_sync(attempt.user_id, badges_to_award, db)
+                    for badge in badges_to_award:
+                        print(f"Awarded badge '{badge.name}' to user {attempt.user_id}")
 
+        # XP, status and badges land in one transaction
         db.commit()
+
+        # Publish the committed XP in one round trip: leaderboard score and
+        # details, and drop the auth snapshot and the precomputed top of the
+        # leaderboard (the next leaderboard read rebuilds it)
+        if total_xp is not None:
+            with redis_client.pipeline(transaction=False) as pipe:
+                pipe.zadd("leaderboard", {str(attempt.user_id): total_xp})
+                pipe.hset(
+                    f"lbuser:{attempt.user_id}",
+                    mapping={"username": username, "level": new_level}
+                )
+                pipe.delete(f"user:{attempt.user_id}", LEADERBOARD_SNAPSHOT_KEY)
+                pipe.execute()
+
         print(f"Successfully processed attempt {attempt_id}")
 
     except Exception as e:
@@ -98,70 +142,73 @@ def award_xp_and_badges(attempt_id: str):
         db.close()
 
 
+def get_all_badges_cached_sync(db, ttl: int = 300):
+    """Synchronous version of get_all_badges_cached for Celery."""
+    from app.db.models import Badge
+
+    cached = redis_client.get("badges:all")
+    if cached is not None:
+        rules = _badge_rules_adapter.validate_json(cached)
+    else:
+        rows = db.query(Badge.id, Badge.name, Badge.condition).all()
+        rules = _badge_rules_adapter.validate_python(rows, from_attributes=True)
+        redis_client.setex("badges:all", ttl, _badge_rules_adapter.dump_json(rules))
+
+    return [Badge(**rule.model_dump()) for rule in rules]
+
+
 def evaluate_badge_conditions_sync(user_id, user_total_xp: int, db):
     """Synchronous version of badge evaluation for Celery."""
     from sqlalchemy import func
 
-    from app.db.models import Badge, UserBadge
-
-    # Get all badges
-    all_badges = db.query(Badge).all()
+    from app.db.models import UserBadge
 
-    # Get badges user already has
+    # Get badges the user hasn't earned yet (the badge list itself is cached)
     earned_badge_ids = {
-        row[0] for row in db.query(UserBadge.badge_id).filter(UserBadge.user_id == user_id).all()
+        row[0] for row in db.query(UserBadge.badge_id).filter(UserBadge.user_id == user_id)
     }
-
-    badges_to_award = []
-
-    for badge in all_badges:
-        if badge.id in earned_badge_ids:
-            continue
-
-        condition = badge.condition
-        condition_type = condition.get("type")
-
-        if condition_type == "xp":
-            threshold = condition.get("threshold", 0)
-            if user_total_xp >= threshold:
-                badges_to_award.append(badge)
-
-        elif condition_type == "attempt_count":
-            count_required = condition.get("count", 1)
-            status_filter = condition.get("status", "passed")
-
-            attempt_count = db.query(func.count(Attempt.id)).filter(
-                Attempt.user_id == user_id,
-                Attempt.status == AttemptStatusEnum(status_filter)
-            ).scalar()
-
-            if attempt_count >= count_required:
-                badges_to_award.append(badge)
-
-        elif condition_type == "consecutive_days":
-            days_required = condition.get("days", 7)
-            unique_days = db.query(func.date(Attempt.submitted_at)).filter(
-                Attempt.user_id == user_id,
-                Attempt.status == AttemptStatusEnum.PASSED
-            ).distinct().count()
-
-            if unique_days >= days_required:
-                badges_to_award.append(badge)
-
-    return badges_to_award
+    unearned_badges = [
+        badge for badge in get_all_badges_cached_sync(db)
+        if badge.id not in earned_badge_ids
+    ]
+
+    # Aggregate the user's attempts once; every condition is then a lookup
+    attempt_counts = dict(
+        db.query(Attempt.status, func.count(Attempt.id))
+        .filter(Attempt.user_id == user_id)
+        .group_by(Attempt.status)
+        .all()
+    )
+    unique_days = db.query(func.count(func.distinct(func.date(Attempt.submitted_at)))).filter(
+        Attempt.user_id == user_id,
+        Attempt.status == AttemptStatusEnum.PASSED
+    ).scalar()
+
+    context = {
+        "total_xp": user_total_xp,
+        "attempt_counts": attempt_counts,
+        "unique_days": unique_days,
+    }
+    return filter_qualifying_badges(unearned_badges, context)
 
 
-def award_badge_sync(user_id, badge, db):
-    """Synchronous version of badge awarding for Celery."""
-    from datetime import datetime
+def award_badges_bulk_sync(user_id, badges, db):
+    """
+    Synchronous version of award_badges_bulk for Celery.
+    Leaves the commit to the caller so badges share the XP transaction.
+    """
+    from datetime import datetime, timezone
 
     from app.db.models import UserBadge
 
-    user_badge = UserBadge(
-        user_id=user_id,
-        badge_id=badge.id,
-        awarded_at=datetime.utcnow()
+    # One timestamp for the whole batch; columns store naive UTC
+    awarded_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    db.add_all([
+        UserBadge(user_id=user_id, badge_id=badge.id, awarded_at=awarded_at)
+        for badge in badges
+    ])
+    db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(total_badges=User.total_badges + len(badges))
     )
-
-    db.add(user_badge)
-    db.commit()
@@ -0,0 +1,53 @@
+"""
+Unit tests for badge condition evaluation.
+"""
+from app.db.models import AttemptStatusEnum, Badge
+from app.services.badge_service import filter_qualifying_badges
+
+
+def make_badge(name: str, condition: dict) -> Badge:
+    return Badge(name=name, condition=condition)
+
+
+CONTEXT = {
+    "total_xp": 500,
+    "attempt_counts": {AttemptStatusEnum.PASSED: 3, AttemptStatusEnum.FAILED: 1},
+    "unique_days": 2,
+}
+
+
+class TestFilterQualifyingBadges:
+    """Test table-driven badge condition evaluation."""
+
+    def test_xp_threshold(self):
+        """Test XP badges match at or above the threshold."""
+        badges = [
+            make_badge("met", {"type": "xp", "threshold": 500}),
+            make_badge("unmet", {"type": "xp", "threshold": 501}),
+        ]
+        assert [b.name for b in filter_qualifying_badges(badges, CONTEXT)] == ["met"]
+
+    def test_attempt_count_by_status(self):
+        """Test attempt count badges use the counts for their status."""
+        badges = [
+            make_badge("passed", {"type": "attempt_count", "count": 3, "status": "passed"}),
+            make_badge("failed", {"type": "attempt_count", "count": 2, "status": "failed"}),
+            make_badge("default", {"type": "attempt_count", "count": 3}),
+        ]
+        assert [b.name for b in filter_qualifying_badges(badges, CONTEXT)] == ["passed", "default"]
+
+    def test_consecutive_days(self):
+        """Test day-based badges compare against distinct passed days."""
+        badges = [
+            make_badge("met", {"type": "consecutive_days", "days": 2}),
+            make_badge("unmet", {"type": "consecutive_days"}),
+        ]
+        assert [b.name for b in filter_qualifying_badges(badges, CONTEXT)] == ["met"]
+
+    def test_unknown_condition_never_matches(self):
+        """Test unknown condition types and statuses are ignored."""
+        badges = [
+            make_badge("type", {"type": "mystery"}),
+            make_badge("status", {"type": "attempt_count", "count": 1, "status": "bogus"}),
+        ]
+        assert filter_qualifying_badges(badges, CONTEXT) == []
@@ -0,0 +1,52 @@
+"""
+Unit tests for cursor pagination helpers.
+"""
+import base64
+import json
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import decode_cursor, encode_cursor
+
+
+def _raw_cursor(value) -> str:
+    """Encode an arbitrary JSON value the way encode_cursor does."""
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+
+class TestCursor:
+    """Test cursor encoding and decoding."""
+
+    def test_round_trip(self):
+        """Test a cursor decodes to the sort key it was built from."""
+        timestamp, row_id = datetime(2026, 1, 2, 3, 4, 5, 6), uuid4()
+        assert decode_cursor(encode_cursor(timestamp, row_id)) == (timestamp, row_id)
+
+    def test_offset_timestamp_converted_to_naive_utc(self):
+        """Test an offset-aware timestamp becomes naive UTC."""
+        row_id = uuid4()
+        timestamp, _ = decode_cursor(_raw_cursor(["2026-01-02T05:00:00+02:00", str(row_id)]))
+        assert timestamp == datetime(2026, 1, 2, 3, 0, 0)
+        assert timestamp.tzinfo is None
+
+    @pytest.mark.parametrize("value", [
+        ["2026-01-02T03:04:05", 123],
+        [123, "00000000-0000-0000-0000-000000000000"],
+        ["not-a-date", "00000000-0000-0000-0000-000000000000"],
+        ["2026-01-02T03:04:05"],
+        {"a": 1},
+    ])
+    def test_malformed_cursor_rejected(self, value):
+        """Test malformed cursors give a 400 instead of an error."""
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor(_raw_cursor(value))
+        assert exc_info.value.status_code == 400
+
+    def test_invalid_base64_rejected(self):
+        """Test a cursor that is not base64 JSON gives a 400."""
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor("!!!")
+        assert exc_info.value.status_code == 400
@@ -0,0 +1,64 @@
+"""
+Unit tests for JWT decoding.
+"""
+from datetime import timedelta
+
+from jose import jwt
+
+from app.core import security
+from app.core.config import settings
+from app.core.security import create_access_token, create_refresh_token, decode_token
+
+
+class TestDecodeToken:
+    """Test the HS256 fast path against python-jose."""
+
+    def test_access_token_round_trip(self):
+        """Test a freshly issued access token decodes like jwt.decode."""
+        token = create_access_token({"sub": "user-id"})
+        payload = decode_token(token)
+        assert payload == jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        assert payload["sub"] == "user-id"
+        assert payload["type"] == "access"
+
+    def test_refresh_token_round_trip(self):
+        """Test a refresh token decodes with its type."""
+        payload = decode_token(create_refresh_token({"sub": "user-id"}))
+        assert payload["type"] == "refresh"
+
+    def test_issued_tokens_skip_jose(self, monkeypatch):
+        """Test tokens this app issues are verified without python-jose."""
+        def fail(token):
+            raise AssertionError("HS256 token fell back to python-jose")
+
+        monkeypatch.setattr(security, "_decode_with_jose", fail)
+        payload = decode_token(create_access_token({"sub": "user-id"}))
+        assert payload["sub"] == "user-id"
+
+    def test_expired_token_rejected(self):
+        """Test an expired token is rejected."""
+        token = create_access_token({"sub": "user-id"}, expires_delta=timedelta(seconds=-10))
+        assert decode_token(token) is None
+
+    def test_tampered_payload_rejected(self):
+        """Test a token whose payload was swapped is rejected."""
+        token = create_access_token({"sub": "user-id"})
+        other = create_access_token({"sub": "other-id"})
+        header, _, signature = token.split(".")
+        forged = ".".join([header, other.split(".")[1], signature])
+        assert decode_token(forged) is None
+
+    def test_wrong_key_rejected(self):
+        """Test a token signed with another key is rejected."""
+        token = jwt.encode({"sub": "user-id"}, "not-the-secret", algorithm="HS256")
+        assert decode_token(token) is None
+
+    def test_malformed_token_rejected(self):
+        """Test garbage input is rejected."""
+        assert decode_token("not-a-token") is None
+        assert decode_token(create_access_token({"sub": "x"}) + ".extra") is None
+
+    def test_other_claims_use_jose(self):
+        """Test tokens with claims only jose checks are still validated."""
+        token = jwt.encode({"sub": "user-id", "nbf": 4102444800}, settings.SECRET_KEY, algorithm="HS256")
+        assert decode_token(token) is None
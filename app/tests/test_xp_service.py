@@ -3,6 +3,7 @@ Unit tests for XP service functions.
 """
 from app.services.xp_service import (
     calculate_level,
+    calculate_levels_bulk,
     calculate_next_level_xp,
     calculate_xp_awarded,
     is_passing_score,
@@ -56,6 +57,16 @@ class TestLevelCalculation:
         """Test level calculation with 1600 XP."""
         assert calculate_level(1600) == 5
 
+    def test_calculate_level_perfect_square_boundary(self):
+        """Test level calculation exactly at and just below a level boundary."""
+        assert calculate_level(40000) == 21
+        assert calculate_level(39999) == 20
+
+    def test_calculate_levels_bulk_matches_scalar(self):
+        """Test bulk level calculation agrees with calculate_level."""
+        xps = [-50, 0, 99, 100, 399, 400, 900, 1600, 123456]
+        assert calculate_levels_bulk(xps).tolist() == [calculate_level(xp) for xp in xps]
+
     def test_calculate_next_level_xp_level_1(self):
         """Test next level XP for level 1."""
         assert calculate_next_level_xp(1) == 100
@@ -1,20 +1,42 @@
 """Authentication routes for web frontend."""
-from fastapi import APIRouter, Form, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
+from typing import Optional
+
+from fastapi import APIRouter, Cookie, Form, Request
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
 from sqlalchemy import select
 
+from app.core.config import settings
 from app.core.security import (
+    aget_password_hash,
+    averify_password,
     create_access_token,
     create_refresh_token,
-    get_password_hash,
-    verify_password,
+    decode_token,
 )
 from app.db.models import User
 from app.db.session import async_session_factory
+from app.services.redis_service import revoke_token
+from app.web.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
+
+# Cookie attributes never change, so the Set-Cookie suffixes are built once
+_ACCESS_COOKIE_ATTRS = (
+    f"; HttpOnly; Max-Age={settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60}; Path=/; SameSite=lax"
+)
+_REFRESH_COOKIE_ATTRS = (
+    f"; HttpOnly; Max-Age={settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400}; Path=/; SameSite=lax"
+)
+
+
+def set_auth_cookies(response: Response, access_token: str, refresh_token: str):
+    """Attach the access and refresh token cookies to a response."""
+    response.raw_headers.append(
+        (b"set-cookie", f"access_token={access_token}{_ACCESS_COOKIE_ATTRS}".encode("latin-1"))
+    )
+    response.raw_headers.append(
+        (b"set-cookie", f"refresh_token={refresh_token}{_REFRESH_COOKIE_ATTRS}".encode("latin-1"))
+    )
 
 
 @router.get("/login", response_class=HTMLResponse)
@@ -36,7 +58,7 @@ async def login(
         )
         user = result.scalar_one_or_none()
 
-        if not user or not verify_password(password, user.password_hash):
+        if not user or not await averify_password(password, user.password_hash):
             return templates.TemplateResponse(
                 "auth/login.html",
                 {
@@ -52,20 +74,7 @@ async def login(
 
         # Redirect to dashboard with cookies
         response = RedirectResponse(url="/", status_code=303)
-        response.set_cookie(
-            key="access_token",
-            value=access_token,
-            httponly=True,
-            max_age=1800,  # 30 minutes
-            samesite="lax"
-        )
-        response.set_cookie(
-            key="refresh_token",
-            value=refresh_token,
-            httponly=True,
-            max_age=604800,  # 7 days
-            samesite="lax"
-        )
+        set_auth_cookies(response, access_token, refresh_token)
         return response
 
 
@@ -128,7 +137,7 @@ async def register(
         user = User(
             username=username,
             email=email,
-            password_hash=get_password_hash(password),
+            password_hash=await aget_password_hash(password),
             total_xp=0,
             level=1,
             profile={}
@@ -141,26 +150,22 @@ async def register(
         refresh_token = create_refresh_token(data={"sub": str(user.id)})
 
         response = RedirectResponse(url="/", status_code=303)
-        response.set_cookie(
-            key="access_token",
-            value=access_token,
-            httponly=True,
-            max_age=1800,
-            samesite="lax"
-        )
-        response.set_cookie(
-            key="refresh_token",
-            value=refresh_token,
-            httponly=True,
-            max_age=604800,
-            samesite="lax"
-        )
+        set_auth_cookies(response, access_token, refresh_token)
         return response
 
 
 @router.post("/logout")
-async def logout():
+async def logout(
+    access_token: Optional[str] = Cookie(None),
+    refresh_token: Optional[str] = Cookie(None)
+):
     """Handle logout."""
+    # Revoke both tokens so copies of the cookies stop working too
+    for token in (access_token, refresh_token):
+        payload = decode_token(token) if token else None
+        if payload and "jti" in payload:
+            await revoke_token(payload["jti"], payload["exp"])
+
     response = RedirectResponse(url="/login", status_code=303)
     response.delete_cookie("access_token")
     response.delete_cookie("refresh_token")
@@ -1,44 +1,76 @@
 """Dependencies for web routes."""
-from typing import Optional
+import hashlib
+import time
+from typing import Any, Optional
+from uuid import UUID
 
-from fastapi import Cookie, HTTPException, Request
-from sqlalchemy import select
+from cachetools import TLRUCache
+from fastapi import HTTPException, Request
 
 from app.core.security import decode_token
 from app.db.models import User
 from app.db.session import async_session_factory
+from app.services.redis_service import cache_user, get_auth_state
 
+# Decoded JWT payloads keyed by a hash of the token (never the raw token).
+# Entries live for a few seconds, and never past the token's own expiry.
+_PAYLOAD_TTL = 5
+_payload_cache = TLRUCache(
+    maxsize=10000,
+    ttu=lambda _key, payload, now: min(now + _PAYLOAD_TTL, payload["exp"]),
+    timer=time.time,
+)
 
-async def get_current_user_from_cookie(
-    request: Request,
-    access_token: Optional[str] = Cookie(None)
-) -> Optional[User]:
-    """Get current user from cookie token."""
+
+def decode_cookie_token(token: str) -> dict[str, Any] | None:
+    """Decode a cookie token, reusing a recent decode of the same token."""
+    key = hashlib.sha256(token.encode()).digest()[:16]
+    payload = _payload_cache.get(key)
+    if payload is None:
+        payload = decode_token(token)
+        # Invalid tokens are not cached
+        if payload is not None and "exp" in payload:
+            _payload_cache[key] = payload
+    return payload
+
+
+async def resolve_cookie_user(access_token: Optional[str]) -> Optional[User]:
+    """Resolve the user behind an access token cookie, or None."""
     if not access_token:
         return None
 
-    payload = decode_token(access_token)
+    payload = decode_cookie_token(access_token)
     if not payload:
         return None
 
-    user_id = payload.get("sub")
-    if not user_id:
+    try:
+        user_id = UUID(payload.get("sub"))
+    except (TypeError, ValueError):
         return None
 
-    async with async_session_factory() as session:
-        result = await session.execute(
-            select(User).where(User.id == user_id)
-        )
-        user = result.scalar_one_or_none()
+    # Revocation check and the Redis user snapshot shared with the API
+    revoked, user = await get_auth_state(payload.get("jti"), user_id)
+    if revoked:
+        return None
+    if user is not None:
         return user
 
+    async with async_session_factory() as session:
+        user = await session.get(User, user_id)
+
+    if user is not None:
+        await cache_user(user)
+    return user
+
+
+async def get_current_user_from_cookie(request: Request) -> Optional[User]:
+    """Get the user resolved for this request by WebAuthMiddleware."""
+    return getattr(request.state, "user", None)
+
 
-async def require_user(
-    request: Request,
-    access_token: Optional[str] = Cookie(None)
-) -> User:
+async def require_user(request: Request) -> User:
     """Require authenticated user or redirect to login."""
-    user = await get_current_user_from_cookie(request, access_token)
+    user = getattr(request.state, "user", None)
     if not user:
         # Redirect to login page
         raise HTTPException(
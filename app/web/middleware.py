@@ -0,0 +1,35 @@
+"""ASGI middleware for the web frontend."""
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.web.deps import resolve_cookie_user
+
+# API routes authenticate with bearer tokens and static files need no user
+_SKIP_PREFIXES = ("/api/", "/static/")
+
+
+class WebAuthMiddleware:
+    """
+    Resolve the cookie-authenticated user once per request.
+
+    The user (or None) is stored in scope["state"]["user"], where web
+    dependencies read it as request.state.user. Written as plain ASGI so no
+    Request/Response objects are built around every call.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(_SKIP_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        access_token = None
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                access_token = cookie_parser(value.decode("latin-1")).get("access_token")
+                break
+
+        scope.setdefault("state", {})["user"] = await resolve_cookie_user(access_token)
+        await self.app(scope, receive, send)
@@ -1,19 +1,53 @@
 """Main web routes for SkillQuest frontend."""
+import asyncio
 from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import desc, func, select
+from fastapi.responses import HTMLResponse, RedirectResponse
+from redis.exceptions import RedisError
+from sqlalchemy import Integer, cast, desc, func, or_, select, update
 from sqlalchemy.orm import selectinload
 
-from app.db.models import Attempt, Badge, Challenge, User, UserBadge
+from app.core.security import aget_password_hash, averify_password
+from app.db.models import (
+    Attempt,
+    AttemptStatusEnum,
+    Badge,
+    Challenge,
+    User,
+    UserBadge,
+    utcnow_sql,
+)
 from app.db.session import async_session_factory
+from app.services.redis_service import (
+    invalidate_cached_user,
+    remove_from_leaderboard,
+    update_leaderboard,
+)
+from app.services.xp_service import calculate_next_level_xp
 from app.web.deps import get_current_user_from_cookie, require_user
+from app.web.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
+
+# Static htmx fragments for the change-password form, encoded once
+_PASSWORD_MISMATCH = b'<div class="alert alert-danger mb-4">New passwords do not match</div>'
+_PASSWORD_TOO_SHORT = b'<div class="alert alert-danger mb-4">Password must be at least 8 characters</div>'
+_PASSWORD_INCORRECT = b'<div class="alert alert-danger mb-4">Current password is incorrect</div>'
+_PASSWORD_CHANGED = b'<div class="alert alert-success mb-4">Password changed successfully!</div>'
+
+
+async def _fetch_all(statement):
+    """Run a statement in its own session and return all scalar results."""
+    async with async_session_factory() as session:
+        return (await session.scalars(statement)).all()
+
+
+async def _fetch_one(statement):
+    """Run a statement in its own session and return its single row."""
+    async with async_session_factory() as session:
+        return (await session.execute(statement)).one()
 
 
 @router.get("/", response_class=HTMLResponse)
@@ -24,59 +58,43 @@ async def dashboard(
     """Dashboard page - shows user stats and recent activity."""
     if not user:
         # Redirect to login if not authenticated
-        from fastapi.responses import RedirectResponse
         return RedirectResponse(url="/login", status_code=303)
 
-    async with async_session_factory() as session:
-        # Refresh user data
-        result = await session.execute(
-            select(User).where(User.id == user.id)
-        )
-        user = result.scalar_one()
-
-        # Get recent attempts
-        attempts_result = await session.execute(
+    # The user snapshot is invalidated whenever XP is awarded, so its
+    # counters are current; the independent queries below run concurrently
+    # on separate connections
+    recent_attempts, recent_badges = await asyncio.gather(
+        _fetch_all(
             select(Attempt)
             .where(Attempt.user_id == user.id)
-            .options(selectinload(Attempt.challenge))
+            .options(selectinload(Attempt.challenge).load_only(Challenge.title))
             .order_by(desc(Attempt.started_at))
             .limit(5)
-        )
-        recent_attempts = attempts_result.scalars().all()
-
-        # Get recent badges
-        badges_result = await session.execute(
+        ),
+        _fetch_all(
             select(UserBadge)
             .where(UserBadge.user_id == user.id)
             .options(selectinload(UserBadge.badge))
             .order_by(desc(UserBadge.awarded_at))
             .limit(3)
-        )
-        recent_badges = badges_result.scalars().all()
-
-        # Get total challenges completed
-        completed_count = await session.execute(
-            select(func.count(Attempt.id))
-            .where(Attempt.user_id == user.id)
-            .where(Attempt.status == "passed")
-        )
-        total_completed = completed_count.scalar()
-
-        # Calculate XP to next level
-        current_xp = user.total_xp
-        current_level = user.level
-        next_level_xp = (current_level ** 2) * 100
-        xp_progress = (current_xp - ((current_level - 1) ** 2) * 100) / (next_level_xp - ((current_level - 1) ** 2) * 100) * 100
-
-        return templates.TemplateResponse("dashboard.html", {
-            "request": request,
-            "user": user,
-            "recent_attempts": recent_attempts,
-            "recent_badges": recent_badges,
-            "total_completed": total_completed,
-            "next_level_xp": next_level_xp,
-            "xp_progress": min(xp_progress, 100)
-        })
+        ),
+    )
+
+    # Calculate XP to next level
+    current_xp = user.total_xp
+    current_level_xp = calculate_next_level_xp(user.level - 1)
+    next_level_xp = calculate_next_level_xp(user.level)
+    xp_progress = (current_xp - current_level_xp) / (next_level_xp - current_level_xp) * 100
+
+    return templates.TemplateResponse("dashboard.html", {
+        "request": request,
+        "user": user,
+        "recent_attempts": recent_attempts,
+        "recent_badges": recent_badges,
+        "total_completed": user.total_challenges_passed,
+        "next_level_xp": next_level_xp,
+        "xp_progress": min(xp_progress, 100)
+    })
 
 
 @router.get("/challenges", response_class=HTMLResponse)
@@ -88,28 +106,43 @@ async def challenges_list(
 ):
     """List all challenges with filtering."""
     if not user:
-        from fastapi.responses import RedirectResponse
         return RedirectResponse(url="/login", status_code=303)
 
     limit = 12
     skip = (page - 1) * limit
 
     async with async_session_factory() as session:
-        # Build query
-        query = select(Challenge).where(Challenge.published)
+        # Build query with only the card's columns; the description is cut
+        # server-side just past the template's 150-character preview, and
+        # the window count returns the total alongside the page
+        query = select(
+            Challenge.id,
+            Challenge.title,
+            Challenge.difficulty,
+            Challenge.tags,
+            Challenge.xp,
+            func.substr(Challenge.description, 1, 151).label("description"),
+            func.count().over().label("total"),
+        ).where(Challenge.published)
 
         if difficulty:
             query = query.where(Challenge.difficulty == difficulty)
 
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await session.execute(count_query)
-        total = total_result.scalar()
-
-        # Get paginated results
-        query = query.order_by(desc(Challenge.created_at)).offset(skip).limit(limit)
-        result = await session.execute(query)
-        challenges = result.scalars().all()
+        result = await session.execute(
+            query.order_by(desc(Challenge.created_at), desc(Challenge.id)).offset(skip).limit(limit)
+        )
+        rows = result.all()
+        challenges = rows
+
+        if rows:
+            total = rows[0].total
+        elif page > 1:
+            # Past the last page no row carries the total, so count separately
+            total = await session.scalar(
+                select(func.count()).select_from(query.with_only_columns(Challenge.id).subquery())
+            )
+        else:
+            total = 0
 
         total_pages = (total + limit - 1) // limit
 
@@ -172,7 +205,6 @@ async def start_challenge(
         )
         session.add(attempt)
         await session.commit()
-        await session.refresh(attempt)
 
         # Return success message for htmx
         return HTMLResponse(
@@ -190,51 +222,75 @@ async def submit_attempt(
     user: User = Depends(require_user)
 ):
     """Submit an attempt (htmx endpoint)."""
+    passed = score >= 70
+    status = "passed" if passed else "failed"
+
     async with async_session_factory() as session:
-        # Get attempt
+        # Grade the attempt in place; xp_awarded is computed from the
+        # challenge row in the same UPDATE ... FROM statement. Only a
+        # STARTED attempt is graded, so the user's counters below move
+        # once per attempt however often it is submitted
         result = await session.execute(
-            select(Attempt)
+            update(Attempt)
             .where(Attempt.id == attempt_id)
             .where(Attempt.user_id == user.id)
-            .options(selectinload(Attempt.challenge))
+            .where(Attempt.status == AttemptStatusEnum.STARTED)
+            .where(Challenge.id == Attempt.challenge_id)
+            .values(
+                status=status,
+                score=score,
+                xp_awarded=Challenge.xp * score // 100,
+                attempt_metadata={"solution": solution} if solution else {},
+                submitted_at=utcnow_sql(),
+            )
+            .returning(Attempt.xp_awarded)
         )
-        attempt = result.scalar_one_or_none()
-
-        if not attempt:
-            raise HTTPException(status_code=404, detail="Attempt not found")
-
-        # Update attempt
-        attempt.status = "passed" if score >= 70 else "failed"
-        attempt.score = score
-        attempt.xp_awarded = int(attempt.challenge.xp * (score / 100))
-        attempt.attempt_metadata = {"solution": solution} if solution else {}
+        xp_awarded = result.scalar_one_or_none()
 
-        from datetime import datetime
-        attempt.submitted_at = datetime.utcnow()
+        if xp_awarded is None:
+            # Nothing was graded; look up why
+            result = await session.execute(
+                select(Attempt.user_id).where(Attempt.id == attempt_id)
+            )
+            if result.scalar_one_or_none() != user.id:
+                raise HTTPException(status_code=404, detail="Attempt not found")
+            raise HTTPException(status_code=400, detail="Attempt already submitted")
 
-        # Fetch user from session to ensure it's tracked by SQLAlchemy
-        user_result = await session.execute(
-            select(User).where(User.id == user.id)
+        # Increment the user's counters atomically; the level is derived
+        # from the new total in SQL, matching calculate_level
+        new_total_xp = User.total_xp + xp_awarded
+        result = await session.execute(
+            update(User)
+            .where(User.id == user.id)
+            .values(
+                total_xp=new_total_xp,
+                level=cast(func.floor(func.sqrt(new_total_xp // 100)), Integer) + 1,
+                total_challenges_passed=User.total_challenges_passed + int(passed),
+            )
+            .returning(User.total_xp, User.level, User.username)
         )
-        db_user = user_result.scalar_one()
-
-        # Update user XP
-        db_user.total_xp += attempt.xp_awarded
-        db_user.level = int((db_user.total_xp / 100) ** 0.5) + 1
+        total_xp, level, username = result.one()
 
         await session.commit()
+        # The submission is committed; a Redis failure must not turn it
+        # into an error, the caches catch up on their TTLs
+        try:
+            await invalidate_cached_user(user.id)
+            await update_leaderboard(user.id, total_xp, username, level)
+        except RedisError:
+            pass
 
         # Return success HTML for htmx
-        status_class = "success" if attempt.status == "passed" else "danger"
+        status_class = "success" if passed else "danger"
         return HTMLResponse(
-            content=f'''
-            <div class="alert alert-{status_class}">
-                <strong>{'Passed!' if attempt.status == 'passed' else 'Failed'}</strong><br>
-                Score: {score}/100<br>
-                XP Awarded: {attempt.xp_awarded}<br>
-                <a href="/progress" class="btn btn-sm btn-primary mt-2">View Progress</a>
-            </div>
-            ''',
+            content=(
+                f'<div class="alert alert-{status_class}">'
+                f'<strong>{"Passed!" if passed else "Failed"}</strong><br>'
+                f'Score: {score}/100<br>'
+                f'XP Awarded: {xp_awarded}<br>'
+                '<a href="/progress" class="btn btn-sm btn-primary mt-2">View Progress</a>'
+                '</div>'
+            ),
             status_code=200
         )
 
@@ -245,53 +301,38 @@ async def progress_page(
     user: User = Depends(require_user)
 ):
     """User progress page."""
-    async with async_session_factory() as session:
-        # Refresh user
-        result = await session.execute(
-            select(User).where(User.id == user.id)
-        )
-        user = result.scalar_one()
-
-        # Get all user badges
-        badges_result = await session.execute(
+    earned_badges, recent_attempts, (total_attempts_count, passed_count) = await asyncio.gather(
+        _fetch_all(
             select(UserBadge)
             .where(UserBadge.user_id == user.id)
             .options(selectinload(UserBadge.badge))
             .order_by(desc(UserBadge.awarded_at))
-        )
-        earned_badges = badges_result.scalars().all()
-
-        # Get recent attempts
-        attempts_result = await session.execute(
+        ),
+        _fetch_all(
             select(Attempt)
             .where(Attempt.user_id == user.id)
-            .options(selectinload(Attempt.challenge))
+            .options(selectinload(Attempt.challenge).load_only(Challenge.title))
             .order_by(desc(Attempt.started_at))
             .limit(10)
-        )
-        recent_attempts = attempts_result.scalars().all()
-
-        # Calculate stats
-        total_attempts = await session.execute(
-            select(func.count(Attempt.id)).where(Attempt.user_id == user.id)
-        )
-        total_attempts_count = total_attempts.scalar()
-
-        passed_attempts = await session.execute(
-            select(func.count(Attempt.id))
+        ),
+        # Total and passed attempts in a single pass
+        _fetch_one(
+            select(
+                func.count(Attempt.id),
+                func.count(Attempt.id).filter(Attempt.status == "passed"),
+            )
             .where(Attempt.user_id == user.id)
-            .where(Attempt.status == "passed")
-        )
-        passed_count = passed_attempts.scalar()
+        ),
+    )
 
-        return templates.TemplateResponse("progress.html", {
-            "request": request,
-            "user": user,
-            "earned_badges": earned_badges,
-            "recent_attempts": recent_attempts,
-            "total_attempts": total_attempts_count,
-            "passed_count": passed_count
-        })
+    return templates.TemplateResponse("progress.html", {
+        "request": request,
+        "user": user,
+        "earned_badges": earned_badges,
+        "recent_attempts": recent_attempts,
+        "total_attempts": total_attempts_count,
+        "passed_count": passed_count
+    })
 
 
 @router.get("/leaderboard", response_class=HTMLResponse)
@@ -300,23 +341,28 @@ async def leaderboard_page(
     user: Optional[User] = Depends(get_current_user_from_cookie)
 ):
     """Leaderboard page."""
+    # Number every user once: position picks the top 50, rank gives the
+    # current user's standing (ties share a rank), all in one round-trip
+    ranked = select(
+        User.id,
+        User.username,
+        User.level,
+        User.total_xp,
+        func.rank().over(order_by=desc(User.total_xp)).label("rank"),
+        func.row_number().over(order_by=(desc(User.total_xp), User.id)).label("position"),
+    ).subquery()
+
+    query = select(ranked).order_by(ranked.c.position)
+    if user:
+        query = query.where(or_(ranked.c.position <= 50, ranked.c.id == user.id))
+    else:
+        query = query.where(ranked.c.position <= 50)
+
     async with async_session_factory() as session:
-        # Get top users
-        result = await session.execute(
-            select(User)
-            .order_by(desc(User.total_xp))
-            .limit(50)
-        )
-        top_users = result.scalars().all()
-
-        # Get current user's rank if authenticated
-        user_rank = None
-        if user:
-            rank_result = await session.execute(
-                select(func.count(User.id))
-                .where(User.total_xp > user.total_xp)
-            )
-            user_rank = rank_result.scalar() + 1
+        rows = (await session.execute(query)).all()
+
+        top_users = [row for row in rows if row.position <= 50]
+        user_rank = next((row.rank for row in rows if user and row.id == user.id), None)
 
         return templates.TemplateResponse("leaderboard.html", {
             "request": request,
@@ -332,22 +378,24 @@ async def badges_page(
     user: User = Depends(require_user)
 ):
     """Badges gallery page."""
-    async with async_session_factory() as session:
-        # Get all badges
-        all_badges_result = await session.execute(select(Badge))
-        all_badges = all_badges_result.scalars().all()
+    # Every badge with an earned flag; EXISTS avoids duplicate rows
+    earned = (
+        select(UserBadge.id)
+        .where(UserBadge.badge_id == Badge.id)
+        .where(UserBadge.user_id == user.id)
+        .exists()
+        .label("earned")
+    )
 
-        # Get user's earned badges
-        earned_result = await session.execute(
-            select(UserBadge.badge_id).where(UserBadge.user_id == user.id)
-        )
-        earned_badge_ids = {row[0] for row in earned_result.all()}
+    async with async_session_factory() as session:
+        result = await session.execute(select(Badge, earned))
+        badges = result.tuples().all()
 
         return templates.TemplateResponse("badges.html", {
             "request": request,
             "user": user,
-            "all_badges": all_badges,
-            "earned_badge_ids": earned_badge_ids
+            "badges": badges,
+            "earned_count": sum(1 for _, is_earned in badges if is_earned)
         })
 
 
@@ -357,24 +405,16 @@ async def account_page(
     user: User = Depends(require_user)
 ):
     """User account settings page."""
-    async with async_session_factory() as session:
-        # Refresh user data
-        result = await session.execute(
-            select(User).where(User.id == user.id)
-        )
-        user = result.scalar_one()
+    # Get badge count
+    (badge_count,) = await _fetch_one(
+        select(func.count(UserBadge.id)).where(UserBadge.user_id == user.id)
+    )
 
-        # Get badge count
-        badge_count_result = await session.execute(
-            select(func.count(UserBadge.id)).where(UserBadge.user_id == user.id)
-        )
-        badge_count = badge_count_result.scalar()
-
-        return templates.TemplateResponse("account.html", {
-            "request": request,
-            "user": user,
-            "badge_count": badge_count
-        })
+    return templates.TemplateResponse("account.html", {
+        "request": request,
+        "user": user,
+        "badge_count": badge_count
+    })
 
 
 @router.post("/account/change-password")
@@ -389,38 +429,34 @@ async def change_password(
     # Validate passwords match
     if new_password != confirm_password:
         return HTMLResponse(
-            content='<div class="alert alert-danger mb-4">New passwords do not match</div>',
+            content=_PASSWORD_MISMATCH,
             status_code=400
         )
 
     # Validate password length
     if len(new_password) < 8:
         return HTMLResponse(
-            content='<div class="alert alert-danger mb-4">Password must be at least 8 characters</div>',
+            content=_PASSWORD_TOO_SHORT,
             status_code=400
         )
 
     async with async_session_factory() as session:
         # Get fresh user data with password
-        result = await session.execute(
-            select(User).where(User.id == user.id)
-        )
-        user = result.scalar_one()
+        user = await session.get_one(User, user.id)
 
         # Verify current password
-        from app.core.security import get_password_hash, verify_password
-        if not verify_password(current_password, user.password_hash):
+        if not await averify_password(current_password, user.password_hash):
             return HTMLResponse(
-                content='<div class="alert alert-danger mb-4">Current password is incorrect</div>',
+                content=_PASSWORD_INCORRECT,
                 status_code=400
             )
 
         # Update password
-        user.password_hash = get_password_hash(new_password)
+        user.password_hash = await aget_password_hash(new_password)
         await session.commit()
 
         return HTMLResponse(
-            content='<div class="alert alert-success mb-4">Password changed successfully!</div>',
+            content=_PASSWORD_CHANGED,
             status_code=200
         )
 
@@ -433,17 +469,18 @@ async def delete_account(
     """Delete user account."""
     async with async_session_factory() as session:
         # Get fresh user
-        result = await session.execute(
-            select(User).where(User.id == user.id)
-        )
-        user = result.scalar_one()
+        user = await session.get_one(User, user.id)
 
         # Delete user (cascade will delete related records)
         await session.delete(user)
         await session.commit()
+        try:
+            await invalidate_cached_user(user.id)
+            await remove_from_leaderboard(user.id)
+        except RedisError:
+            pass
 
         # Clear cookies and redirect to login
-        from fastapi.responses import RedirectResponse
         response = RedirectResponse(url="/login?deleted=true", status_code=303)
         response.delete_cookie("access_token")
         response.delete_cookie("refresh_token")
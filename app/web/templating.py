@@ -0,0 +1,18 @@
+"""Shared Jinja2 templates for the web frontend."""
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from app.core.config import settings
+
+# One environment for every web router: templates are compiled once and kept
+# (cache_size=-1), and compiled bytecode survives restarts. Outside debug
+# mode the template files are not re-checked for changes on each render.
+_environment = Environment(
+    loader=FileSystemLoader("app/templates"),
+    autoescape=True,
+    auto_reload=settings.DEBUG,
+    cache_size=-1,
+    bytecode_cache=FileSystemBytecodeCache(),
+)
+
+templates = Jinja2Templates(env=_environment)
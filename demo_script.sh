@@ -49,9 +49,9 @@ echo ""
 echo -e "${BLUE}4. Listing available challenges...${NC}"
 CHALLENGES_RESPONSE=$(curl -s -X GET "$API_URL/challenges?limit=5")
 echo "$CHALLENGES_RESPONSE" | jq '.'
-CHALLENGE_ID=$(echo "$CHALLENGES_RESPONSE" | jq -r '.[0].id')
-CHALLENGE_TITLE=$(echo "$CHALLENGES_RESPONSE" | jq -r '.[0].title')
-CHALLENGE_XP=$(echo "$CHALLENGES_RESPONSE" | jq -r '.[0].xp')
+CHALLENGE_ID=$(echo "$CHALLENGES_RESPONSE" | jq -r '.items[0].id')
+CHALLENGE_TITLE=$(echo "$CHALLENGES_RESPONSE" | jq -r '.items[0].title')
+CHALLENGE_XP=$(echo "$CHALLENGES_RESPONSE" | jq -r '.items[0].xp')
 echo -e "${GREEN}✓ Found challenge: '$CHALLENGE_TITLE' ($CHALLENGE_XP XP)${NC}"
 echo ""
 
@@ -0,0 +1,73 @@
+"""
+Recalculate every user's level from their total XP.
+
+Run this script after changing the level formula:
+    python -m scripts.recalculate_levels
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, update
+
+from app.db.models import User
+from app.db.session import async_session_factory
+from app.services.redis_service import LEADERBOARD_SNAPSHOT_KEY, close_redis, get_redis
+from app.services.xp_service import calculate_levels_bulk
+
+
+async def recalculate_levels():
+    """Recompute all levels in one pass and write back the ones that changed."""
+    async with async_session_factory() as session:
+        result = await session.execute(select(User.id, User.total_xp, User.level))
+        rows = result.all()
+
+        if not rows:
+            print("No users found")
+            return
+
+        levels = calculate_levels_bulk([row.total_xp for row in rows])
+        changes = [
+            {"id": row.id, "level": int(level)}
+            for row, level in zip(rows, levels)
+            if level != row.level
+        ]
+
+        if changes:
+            # Executes as a single executemany UPDATE keyed on primary key
+            await session.execute(update(User), changes)
+            await session.commit()
+            await publish_levels(changes)
+
+        print(f"Updated levels for {len(changes)} of {len(rows)} users")
+
+
+async def publish_levels(changes: list[dict], batch_size: int = 1000):
+    """
+    Push changed levels to the Redis copies that serve them.
+
+    Updates each user's leaderboard details, drops their cached auth
+    snapshot, and finally drops the precomputed leaderboard.
+
+    Args:
+        changes: {"id", "level"} dicts for the users whose level changed
+        batch_size: Users per pipeline round trip
+    """
+    redis = await get_redis()
+    try:
+        for start in range(0, len(changes), batch_size):
+            async with redis.pipeline(transaction=False) as pipe:
+                for change in changes[start:start + batch_size]:
+                    pipe.hset(f"lbuser:{change['id']}", "level", change["level"])
+                    pipe.delete(f"user:{change['id']}")
+                await pipe.execute()
+        await redis.delete(LEADERBOARD_SNAPSHOT_KEY)
+    finally:
+        await close_redis()
+
+
+if __name__ == "__main__":
+    asyncio.run(recalculate_levels())
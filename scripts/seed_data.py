@@ -23,61 +23,40 @@ async def seed_database():
     async with async_session_factory() as session:
         print("Seeding database...")
 
-        # Check if users already exist
-        result = await session.execute(select(User).where(User.username == "alice"))
-        existing_user = result.scalar_one_or_none()
+        # Load whichever sample users already exist in one query
+        usernames = ["alice", "bob", "charlie"]
+        result = await session.execute(select(User).where(User.username.in_(usernames)))
+        users_by_name = {user.username: user for user in result.scalars()}
+        missing_usernames = [name for name in usernames if name not in users_by_name]
 
-        if existing_user:
+        if not missing_usernames:
             print("Sample users already exist, skipping user creation...")
-            # Get existing users
-            result = await session.execute(
-                select(User).where(User.username.in_(["alice", "bob", "charlie"]))
-            )
-            users = list(result.scalars().all())
         else:
-            # Create sample users
-            users = [
-                User(
-                    username="alice",
-                    email="alice@example.com",
-                    password_hash=get_password_hash("password123"),
-                    total_xp=0,
-                    level=1
-                ),
-                User(
-                    username="bob",
-                    email="bob@example.com",
-                    password_hash=get_password_hash("password123"),
-                    total_xp=0,
-                    level=1
-                ),
+            # All sample users share one password, so hash it once
+            password_hash = get_password_hash("password123")
+
+            # Create the missing sample users
+            new_users = [
                 User(
-                    username="charlie",
-                    email="charlie@example.com",
-                    password_hash=get_password_hash("password123"),
+                    username=name,
+                    email=f"{name}@example.com",
+                    password_hash=password_hash,
                     total_xp=0,
                     level=1
-                ),
+                )
+                for name in missing_usernames
             ]
 
-            for user in users:
-                session.add(user)
-            await session.commit()
-            print(f"Created {len(users)} users")
-
-            # Refresh to get IDs
-            for user in users:
-                await session.refresh(user)
+            # Flush so the generated IDs are available to the challenges below
+            session.add_all(new_users)
+            await session.flush()
+            users_by_name.update((user.username, user) for user in new_users)
+            print(f"Created {len(new_users)} users")
 
-        # Check if challenges already exist
-        result = await session.execute(select(Challenge).where(Challenge.title == "Hello World"))
-        existing_challenge = result.scalar_one_or_none()
+        users = [users_by_name[name] for name in usernames]
 
-        if existing_challenge:
-            print("Sample challenges already exist, skipping challenge creation...")
-        else:
-            # Create sample challenges
-            challenges = [
+        # Sample challenges
+        challenges = [
             Challenge(
                 title="Hello World",
                 description="Write a program that prints 'Hello, World!' to the console.",
@@ -141,22 +120,23 @@ async def seed_database():
                 created_by=users[0].id,
                 published=True
             ),
-            ]
+        ]
 
-            for challenge in challenges:
-                session.add(challenge)
-            await session.commit()
-            print(f"Created {len(challenges)} challenges")
-
-        # Check if badges already exist
-        result = await session.execute(select(Badge).where(Badge.name == "First Steps"))
-        existing_badge = result.scalar_one_or_none()
+        # Only create the challenges that are not there yet, found in one query
+        result = await session.execute(
+            select(Challenge.title).where(Challenge.title.in_([item.title for item in challenges]))
+        )
+        existing = set(result.scalars().all())
+        challenges = [item for item in challenges if item.title not in existing]
 
-        if existing_badge:
-            print("Sample badges already exist, skipping badge creation...")
+        if not challenges:
+            print("Sample challenges already exist, skipping challenge creation...")
         else:
-            # Create sample badges
-            badges = [
+            session.add_all(challenges)
+            print(f"Created {len(challenges)} challenges")
+
+        # Sample badges
+        badges = [
             Badge(
                 name="First Steps",
                 description="Complete your first challenge",
@@ -193,13 +173,24 @@ async def seed_database():
                 condition={"type": "consecutive_days", "days": 7},
                 icon_url="https://example.com/badges/dedicated.png"
             ),
-            ]
+        ]
+
+        # Only create the badges that are not there yet, found in one query
+        result = await session.execute(
+            select(Badge.name).where(Badge.name.in_([item.name for item in badges]))
+        )
+        existing = set(result.scalars().all())
+        badges = [item for item in badges if item.name not in existing]
 
-            for badge in badges:
-                session.add(badge)
-            await session.commit()
+        if not badges:
+            print("Sample badges already exist, skipping badge creation...")
+        else:
+            session.add_all(badges)
             print(f"Created {len(badges)} badges")
 
+        # Everything is written in a single transaction
+        await session.commit()
+
         print("\n✓ Seed data is ready!")
         print("\nSample user credentials:")
         print("  Username: alice | Password: password123")